@@ -0,0 +1,174 @@
+# Bbc machine construction
+# Build complete, independent Ball Bearing Computer simulations.
+
+from sim.signal import Signal, setsig
+from sim.simulation import Simulation
+
+from sim.device.pulse_rom import PulseRom
+from sim.device.latch import PulseLatch
+
+# FUTURE devices (for full design) ...
+# from sim.device.select_direct import Selector, Director
+# from sim.device.orgate import PulseOr
+from sim.device.arith import Counter
+from sim.device.pseudo_devices import sig_bitslice, SigSendCopy
+        # NOTE: sender produces a triggered event from a state output
+        # in ball-bearing terms, this is a COPY : needed for ACC and CY copying.
+        # By contrast, we allow PM and DM addresses to be state-driven (from
+        # pm_addr and m_addr), assuming that there is a specific mechanism for
+        # this ...
+
+from sim.bbc.code import code as DEFAULT_PROGRAM
+from sim.bbc.controller import BbcController
+
+# The individual, latched control signals : split from single IR bits.
+# (machine attribute name, signal name), in order of IR bit number.
+CONTROL_BITS = (
+    ('ctrl_op_Ecy', 'Ecy'),
+    ('ctrl_op_Eor', 'Eor'),
+    ('ctrl_op_adc', 'adc'),
+    ('ctrl_clc_c2a', 'clc_c2a'),
+    ('ctrl_m2a_m2m_NOTa2m', 'm2a_m2m_~a2m'),
+    ('ctrl_k2a_ATm', 'k2a_@m'),
+    ('ctrl_k2m', 'k2m'))
+
+
+class BbcMachine(object):
+    """
+    A built BBC machine : handles to all its devices and signals.
+
+    Made by 'build_bbc'.  The devices all belong to 'self.simulation'.
+
+    """
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.seq = simulation.seq
+
+    def __str__(self):
+        return 'BbcMachine<{}>'.format(self.simulation.name)
+
+    def start(self, time=0.0):
+        """Schedule the start of the instruction cycle."""
+        self.seq.add(setsig(time, self.x_start, '!'))
+
+    def run(self, stop=None):
+        self.simulation.run(stop)
+
+
+def build_bbc(program=None, timings=None, sequencer=None, name='bbc'):
+    """
+    Build a new BBC machine.
+
+    Args:
+
+    * program (list):
+        code table, in the form of sim.bbc.code.code (which is the default).
+    * timings (dict or list):
+        BbcController phase durations :  Either a dict of controller keywords
+        (e.g. {'t_p2_PmFetchIr': 12.0}), or a list of all the durations.
+    * sequencer (Sequencer):
+        sequencer to use (by default, a new one).
+    * name (string):
+        name of the machine Simulation.
+
+    Returns:
+        a BbcMachine.
+
+    """
+    if program is None:
+        program = DEFAULT_PROGRAM
+    phase_names = [phase_name for phase_name, _
+                   in BbcController.phase_names_and_default_durations]
+    if timings is None:
+        timings = {}
+    elif not isinstance(timings, dict):
+        timings = list(timings)
+        if len(timings) != len(phase_names):
+            msg = 'Expected {} phase durations, got {} : {!r}.'
+            raise ValueError(msg.format(len(phase_names), len(timings),
+                                        timings))
+        timings = dict(('t_{}'.format(i_phase), duration)
+                       for i_phase, duration in enumerate(timings))
+    else:
+        valid_keys = set(['t_{}'.format(i_phase)
+                          for i_phase in range(len(phase_names))] +
+                         ['t_' + phase_name for phase_name in phase_names])
+        unknown = sorted(set(timings) - valid_keys)
+        if unknown:
+            msg = 'Unknown phase timings {}, expected some of {}.'
+            raise ValueError(msg.format(unknown, sorted(valid_keys)))
+
+    with Simulation(name, sequencer) as simulation:
+        m = BbcMachine(simulation)
+        m.program = program
+        instruction_names = [
+            instr[0] for instr in program]
+        instruction_ir_bits = [
+            instr[1] for instr in program]
+        instruction_k_values = [
+            (instr[2]
+             if len(instr) > 2
+             else 0)
+            for instr in program]
+
+        m.cycle = BbcController('bbc', **timings)
+        m.x_start = Signal('start')
+        m.cycle.connect('start', m.x_start)
+
+        m.pm_mnemonics = PulseRom(
+            'pm_mnemonics',
+            instruction_names)
+        m.pm_ir = PulseRom(
+            'pm_ir',
+            instruction_ir_bits)
+        m.pm_k = PulseRom(
+            'pm_k',
+            instruction_k_values)
+
+        m.count_pm_addr = Counter('pm_addr', n_bits=6)
+        # in: 'input'
+        # out: 'output', 'x_carry_out'
+
+        # Connect the 'next' signal : it needs to be converted to a '1' for a
+        # multibit counter input.
+        m.ir_plus_1 = SigSendCopy(name='ir+1')
+        m.ir_plus_1.input(0.0, Signal('_tmp', start_state=1))
+        m.ir_plus_1.connect('send', m.cycle.p0_Next)
+        # TODO: this signal will need to be OR-ed with k value (for jumps) and
+        # carry-out (for skips)
+        m.count_pm_addr.connect('input', m.ir_plus_1.output)
+
+        # Wire address and timing signals to all 3 PM roms
+        for pm in (m.pm_mnemonics, m.pm_ir, m.pm_k):
+            pm.connect('addr', m.count_pm_addr.output)
+            pm.connect('x_asel', m.cycle.p1_AddressPm)
+            pm.connect('x_aclr', m.cycle.p5_AddC_SaveA)
+
+        m.pm_mnemonics.connect('x_read', m.cycle.p2_PmFetchIr)
+        m.pm_ir.connect('x_read', m.cycle.p2_PmFetchIr)
+        m.pm_k.connect('x_read', m.cycle.p3_PmFetchK_Clc)
+
+        # Split off top bit of instruction for immediate signal to preclear acc
+        m.ctrl_x_cla = sig_bitslice(m.pm_ir.out, 7, name='!cla')
+        # Rest goes to IR : these ones are all latched
+        m.ir_lower7 = sig_bitslice(m.pm_ir.out, 0, nbits=7)  # NB auto naming
+        m.ir = PulseLatch('ir')
+        m.ir.connect('input', m.ir_lower7.output)
+        # IR is cleared at the start of each cycle, along with addressing PM.
+        # (See "Cycle" in Notes_4bit_Instructions.txt)
+        m.ir.connect('clr', m.cycle.p1_AddressPm)
+
+        # Define individual, latched control signals by splitting off single
+        # IR bits.
+        for num, (attr_name, signame) in enumerate(CONTROL_BITS):
+            setattr(m, attr_name,
+                    sig_bitslice(m.ir.output, num, name=signame))
+
+        #
+        # acc = Accumulator('a', bits=8)
+        #
+        # cy = Counter('cy', bits=1)
+        # cy.cin.connect(acc.cout)
+        # cy.clr.connect(0) #clc
+
+    return m
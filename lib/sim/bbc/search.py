@@ -0,0 +1,123 @@
+"""
+Search for the shortest legal BBC instruction cycle.
+
+Finds the tightest phase durations for which a machine runs a program with
+no timing violations, by coordinate descent :  Each phase duration in turn
+is reduced by bisection, with the others fixed, and rounds are repeated
+until the cycle time no longer improves.
+
+N.B. this assumes that, for each phase, all durations above some minimum
+pass and all below it fail.
+
+"""
+from __future__ import print_function
+
+from collections import namedtuple
+
+from sim.bbc.sweep import sweep, PHASE_NAMES
+
+
+# Result of a search.
+#  timings : the tightest phase durations found
+#  cycle_time : total of the phase durations
+#  n_probes : number of different machine runs made
+#  history : list of (timings, cycle_time), after each round
+SearchResult = namedtuple(
+    'SearchResult', ('timings', 'cycle_time', 'n_probes', 'history'))
+
+
+class _Prober(object):
+    # Run candidates, remembering the results of any already tried.
+    def __init__(self, program, n_cycles, processes):
+        self.program = program
+        self.n_cycles = n_cycles
+        self.processes = processes
+        self.results = {}
+
+    def passes(self, candidates):
+        todo = [timings for timings in candidates
+                if tuple(timings) not in self.results]
+        if todo:
+            results = sweep(todo, program=self.program,
+                            n_cycles=self.n_cycles,
+                            processes=self.processes)
+            for timings, result in zip(todo, results):
+                self.results[tuple(timings)] = result.passed
+        return [self.results[tuple(timings)] for timings in candidates]
+
+
+def min_cycle_search(start, lower=None, tolerance=0.1, program=None,
+                     n_cycles=64, max_rounds=10, processes=0, verbose=False):
+    """
+    Find the tightest legal phase durations.
+
+    Args:
+
+    * start (list):
+        phase durations to start from :  These must pass.
+    * lower (list):
+        lowest duration to try for each phase (default all 0).
+    * tolerance (float):
+        precision of the result durations.
+    * program (list):
+        code table for the machines (default is sim.bbc.code.code).
+    * n_cycles (int):
+        number of instruction cycles each probe must complete.
+    * max_rounds (int):
+        maximum number of rounds (of reducing every phase).
+    * processes (int):
+        if 0 (default), probe one point at a time (bisection).
+        Otherwise, probe this many points at once, in worker processes,
+        dividing each interval into 'processes + 1' parts per step.
+
+    Returns:
+        a SearchResult.
+
+    """
+    current = [float(duration) for duration in start]
+    if lower is None:
+        lower = [0.0] * len(current)
+    prober = _Prober(program, n_cycles, processes)
+    if not prober.passes([current])[0]:
+        raise ValueError('Starting durations {} fail.'.format(current))
+    n_points = max(1, processes)
+    history = []
+    for _ in range(max_rounds):
+        cycle_time = sum(current)
+        for i_phase in range(len(current)):
+            low, high = lower[i_phase], current[i_phase]
+            while high - low > tolerance:
+                step = (high - low) / (n_points + 1)
+                points = [low + step * (i_point + 1)
+                          for i_point in range(n_points)]
+                candidates = []
+                for point in points:
+                    candidate = current[:]
+                    candidate[i_phase] = point
+                    candidates.append(candidate)
+                passes = prober.passes(candidates)
+                # New interval : between the highest fail below the lowest
+                # pass, and that pass.
+                if any(passes):
+                    i_pass = passes.index(True)
+                    high = points[i_pass]
+                    if i_pass > 0:
+                        low = points[i_pass - 1]
+                else:
+                    low = points[-1]
+            current[i_phase] = high
+            if verbose:
+                print('  {} --> {:.3f}'.format(PHASE_NAMES[i_phase], high))
+        history.append((current[:], sum(current)))
+        if verbose:
+            print('round {}: cycle time {:.3f}'.format(
+                len(history), sum(current)))
+        if cycle_time - sum(current) <= tolerance:
+            break
+    return SearchResult(current, sum(current), len(prober.results), history)
+
+
+if __name__ == '__main__':
+    result = min_cycle_search([30.0, 2.5, 12.0, 20.0, 10.0, 10.0],
+                              verbose=True)
+    print(result.timings, result.cycle_time, result.n_probes)
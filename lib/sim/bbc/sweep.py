@@ -0,0 +1,182 @@
+"""
+Parameter sweeps over the BBC instruction-cycle phase durations.
+
+Each candidate vector of phase durations is run on a freshly built machine,
+for a fixed number of instruction cycles.  A candidate fails if any device
+detects a timing violation (an okeq / okin check failure).
+Candidates are spread over a pool of worker processes.
+
+"""
+from __future__ import print_function
+
+from collections import namedtuple
+import itertools
+from multiprocessing import Pool, cpu_count
+from numbers import Number
+import random
+
+from sim.bbc.controller import BbcController
+from sim.bbc.machine import build_bbc
+
+
+PHASE_NAMES = [name for name, _ in
+               BbcController.phase_names_and_default_durations]
+
+DEFAULT_DURATIONS = [duration for _, duration in
+                     BbcController.phase_names_and_default_durations]
+
+# One result row.
+#  timings : the phase durations
+#  passed : whether all cycles ran with no timing violation
+#  t_violation : time of the first violation (or None)
+#  violation : the violation message (or None)
+#  cycle_time : total of the phase durations
+#  throughput : instructions per unit time (0 if failed)
+SweepResult = namedtuple(
+    'SweepResult',
+    ('timings', 'passed', 't_violation', 'violation',
+     'cycle_time', 'throughput'))
+
+
+def check_timings(timings):
+    """
+    Check candidate phase durations :  There must be one for each phase, and
+    all must be > 0.  Raises a ValueError if not.
+
+    """
+    timings = list(timings)
+    if len(timings) != len(PHASE_NAMES):
+        msg = 'Expected {} phase durations, got {} : {!r}.'
+        raise ValueError(msg.format(len(PHASE_NAMES), len(timings), timings))
+    for phase_name, duration in zip(PHASE_NAMES, timings):
+        if not isinstance(duration, Number) or not duration > 0:
+            msg = 'Phase duration {}={!r} is not > 0, in {!r}.'
+            raise ValueError(msg.format(phase_name, duration, timings))
+
+
+def run_candidate(timings, program=None, n_cycles=64):
+    """
+    Run one machine with the given phase durations.
+
+    Returns a SweepResult.
+    Invalid durations raise a ValueError (see 'check_timings'), but any
+    error in the run itself is recorded as a failure.
+
+    """
+    timings = list(timings)
+    check_timings(timings)
+    machine = build_bbc(program, timings=timings)
+    cycle_time = sum(timings)
+    machine.start(0.0)
+    t_violation, violation = None, None
+    try:
+        # Stop just before the start of cycle 'n_cycles + 1'.
+        machine.run(n_cycles * cycle_time - 0.5 * timings[-1])
+    except ValueError as err:
+        # A state check failure, i.e. a timing violation.
+        t_violation = machine.seq.time
+        violation = str(err)
+    except Exception as err:
+        # Anything else also fails this candidate, but not the whole sweep.
+        t_violation = machine.seq.time
+        violation = '{}: {}'.format(type(err).__name__, err)
+    passed = violation is None
+    throughput = 1.0 / cycle_time if passed else 0.0
+    return SweepResult(timings, passed, t_violation, violation,
+                       cycle_time, throughput)
+
+
+def _run_candidate_args(args):
+    # Pool.map passes a single argument.
+    return run_candidate(*args)
+
+
+def grid(values_per_phase):
+    """
+    Make candidates from all combinations of values for each phase.
+
+    Each entry of 'values_per_phase' is a list of values, or a single value.
+
+    """
+    values_per_phase = [
+        values if hasattr(values, '__iter__') else [values]
+        for values in values_per_phase]
+    return [list(timings)
+            for timings in itertools.product(*values_per_phase)]
+
+
+def random_sample(bounds_per_phase, n_samples, seed=None):
+    """
+    Make candidates with uniform random values for each phase.
+
+    Each entry of 'bounds_per_phase' is a (min, max) pair, or a single value.
+
+    """
+    rand = random.Random(seed)
+    bounds_per_phase = [
+        bounds if hasattr(bounds, '__iter__') else (bounds, bounds)
+        for bounds in bounds_per_phase]
+    return [[rand.uniform(lower, upper) for lower, upper in bounds_per_phase]
+            for _ in range(n_samples)]
+
+
+def sweep(candidates, program=None, n_cycles=64, processes=None,
+          chunksize=None):
+    """
+    Run all candidate phase durations, in parallel.
+
+    Args:
+
+    * candidates (list of lists):
+        phase durations to test, e.g. from 'grid' or 'random_sample'.
+    * program (list):
+        code table for the machines (default is sim.bbc.code.code).
+    * n_cycles (int):
+        number of instruction cycles each candidate must complete.
+    * processes (int):
+        number of worker processes (default = number of cpus).
+        If 0, run everything in this process.
+    * chunksize (int):
+        candidates per worker task (default, ~4 tasks per process).
+
+    Returns:
+        a list of SweepResult, one per candidate, in the same order.
+
+    """
+    # Reject bad candidates before starting any runs.
+    for timings in candidates:
+        check_timings(timings)
+    args = [(timings, program, n_cycles) for timings in candidates]
+    if processes == 0:
+        return [_run_candidate_args(arg) for arg in args]
+    if processes is None:
+        processes = cpu_count()
+    if chunksize is None:
+        chunksize = max(1, len(args) // (4 * processes))
+    pool = Pool(processes)
+    try:
+        results = pool.map(_run_candidate_args, args, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def format_results(results):
+    """Make a printable table of sweep results."""
+    lines = ['  '.join(['{:>8s}'.format(name[:8]) for name in PHASE_NAMES] +
+                       ['  passed', '  cycle', ' t_fail'])]
+    for result in results:
+        t_fail = ('{:7.1f}'.format(result.t_violation)
+                  if result.t_violation is not None else '      -')
+        lines.append('  '.join(
+            ['{:8.2f}'.format(duration) for duration in result.timings] +
+            ['{:>8s}'.format(str(result.passed)),
+             '{:7.2f}'.format(result.cycle_time),
+             t_fail]))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    candidates = grid([[20.0, 30.0], 2.5, [8.0, 12.0], 20.0, 10.0, 10.0])
+    print(format_results(sweep(candidates)))
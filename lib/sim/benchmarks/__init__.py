@@ -0,0 +1,22 @@
+# Benchmark scripts : run as, e.g. "python -m sim.benchmarks.bench_sequencer".
+from __future__ import print_function
+
+import time
+
+
+def timed(call, *args, **kwargs):
+    """Call a function, and return (elapsed-seconds, result)."""
+    t_start = time.time()
+    result = call(*args, **kwargs)
+    return time.time() - t_start, result
+
+
+def report(title, rows, headings):
+    """Print a simple table of benchmark results."""
+    print('\n' + title)
+    widths = [max(len(str(x)) for x in [heading] + [row[i] for row in rows])
+              for i, heading in enumerate(headings)]
+    line = '  '.join('{{:>{}}}'.format(width) for width in widths)
+    print(line.format(*headings))
+    for row in rows:
+        print(line.format(*row))
@@ -0,0 +1,167 @@
+"""
+Benchmark device call overheads.
+
+(1) Microbenchmarks : direct calls to device input and action methods.
+(2) Action dispatch : events per second, running scheduled Actions.
+(3) Signal fan-out : bit consumers, filtering in the device or the connection.
+(4) A whole simulation : a 6-bit counter, counting continuously.
+
+"""
+from __future__ import print_function
+
+import timeit
+
+from sim.signal import Signal, setsig
+from sim.sequencer import Sequencer
+from sim.device import Device, Action
+from sim.device.pseudo_devices import sig_bitslice
+from sim.device.arith import Counter, BehaviouralCounter
+from sim.benchmarks import timed, report
+
+
+class _Null(Device):
+    # A device with do-nothing methods, to measure the call overhead.
+    @Device.input
+    def input(self, time, signal):
+        pass
+
+    @Device.action
+    def _act(self, time, value):
+        pass
+
+
+def _hook(*args):
+    pass
+
+
+def micro(n_calls=200000):
+    rows = []
+    for label, setup in (
+            ('plain', None),
+            ('traced-other', lambda dev: dev.trace('_act')),
+            ('hooked', lambda dev: (dev.hook('input', _hook),
+                                    dev.hook('_act', _hook)))):
+        dev = _Null('null', sequencer=Sequencer())
+        sig = Signal('null_in')
+        dev.connect('input', sig)
+        if setup is not None:
+            setup(dev)
+        t_input = timeit.timeit(lambda: dev.input(0.0, sig), number=n_calls)
+        t_signal = timeit.timeit(lambda: sig.set(0.0, 1), number=n_calls)
+        if label != 'traced-other':
+            t_action = timeit.timeit(lambda: dev._act(0.0, 1),
+                                     number=n_calls)
+            t_action = '{:.0f}'.format(1e9 * t_action / n_calls)
+        else:
+            t_action = '-'
+        rows.append([label,
+                     '{:.0f}'.format(1e9 * t_input / n_calls),
+                     '{:.0f}'.format(1e9 * t_signal / n_calls),
+                     t_action])
+    report('Nanoseconds per call',
+           rows, ['device', 'input', 'signal.set', 'action'])
+
+
+def action_run(n_events=100000, args=(1,), kwargs={}):
+    seq = Sequencer()
+    dev = _Null('null', sequencer=seq)
+    seq.addall([(float(i_event), Action(dev, '_act', *args, **kwargs))
+                for i_event in range(n_events)])
+    secs, _ = timed(seq.run)
+    return secs
+
+
+def action_events(n_events=100000):
+    rows = []
+    for label, args, kwargs in (('args', (1,), {}),
+                                ('kwargs', (), {'value': 1})):
+        secs = action_run(n_events, args, kwargs)
+        rows.append([label, '{:.3f}'.format(secs),
+                     '{:.0f}'.format(n_events / secs)])
+    report('Action events', rows, ['action', 'seconds', 'events/sec'])
+
+
+class _BitWatch(Device):
+    # A consumer of one bit of a bus, which only acts on changes.
+    def __init__(self, name, i_bit, *args, **kwargs):
+        super(_BitWatch, self).__init__(name, *args, **kwargs)
+        self.i_bit = i_bit
+        self.n_changes = 0
+
+    @Device.input
+    def input(self, time, signal):
+        # Unfiltered : check for a change here.
+        i_bit = self.i_bit
+        if (signal.state >> i_bit) & 1 == (signal.previous >> i_bit) & 1:
+            return
+        self.n_changes += 1
+
+    @Device.input
+    def filtered_input(self, time, signal):
+        # Filtered by the connection : only called on a change.
+        self.n_changes += 1
+
+
+def fanout(n_sets=20000, n_bits=8):
+    rows = []
+    n_loops = n_sets // 256
+    for label, filtered, sliced in (
+            ('SigBitslice', False, True),
+            ('in device', False, False),
+            ('in connection', True, False)):
+        bus = Signal('fanout_bus')
+        watches = [_BitWatch('watch_{}'.format(i_bit), i_bit)
+                   for i_bit in range(n_bits)]
+        for watch in watches:
+            if filtered:
+                watch.connect('filtered_input', bus,
+                              mask=1, shift=watch.i_bit, edge='change')
+            elif sliced:
+                watch.connect('input', sig_bitslice(bus, watch.i_bit).output)
+                watch.i_bit = 0
+            else:
+                watch.connect('input', bus)
+        secs = min(timeit.repeat(
+            lambda: [bus.set(0.0, value) for value in range(256)],
+            number=n_loops, repeat=5))
+        n_changes = sum(watch.n_changes for watch in watches)
+        rows.append([label,
+                     '{:.0f}'.format(1e9 * secs / (256 * n_loops)),
+                     '{:.2f}'.format(n_changes / (5.0 * 256 * n_loops))])
+    report('Fan-out of {} one-bit consumers'.format(n_bits), rows,
+           ['bits selected by', 'ns/set', 'calls passed/set'])
+
+
+def count_run(n_counts=2000, counter_class=Counter, n_bits=6):
+    seq = Sequencer()
+    counter = counter_class('bench_count', n_bits=n_bits,
+                            sequencer=seq)
+    din = Signal('bench_din')
+    counter.connect('input', din)
+    seq.addall([setsig(50.0 * i_count, din, 1)
+                for i_count in range(n_counts)])
+    seq.run()
+    return counter.output.state
+
+
+def counter_sim(n_counts=2000):
+    rows = []
+    for counter_class, n_bits in ((Counter, 6), (BehaviouralCounter, 6),
+                                  (Counter, 16), (BehaviouralCounter, 16)):
+        secs, value = timed(count_run, n_counts, counter_class, n_bits)
+        rows.append([counter_class.__name__, n_bits, n_counts,
+                     '{:.3f}'.format(secs),
+                     '{:.0f}'.format(n_counts / secs)])
+    report('Counter simulation',
+           rows, ['counter', 'bits', 'counts', 'seconds', 'counts/sec'])
+
+
+def main():
+    micro()
+    action_events()
+    fanout()
+    counter_sim()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark the sequencer types.
+
+(1) A "hold" model : a fixed number of pending events, each of which
+schedules a new one a short, fixed-choice delay ahead (like wire and device
+delays).
+
+(2) Preloading a large number of stimulus events, one at a time or with
+a single 'addall'.
+
+"""
+from __future__ import print_function
+
+import random
+
+from sim.sequencer import SEQUENCER_TYPES
+from sim.benchmarks import timed, report
+
+
+DELAYS = [1.0, 2.5, 3.0, 5.0, 10.0]
+
+
+def hold_model(seq, n_pending, n_events):
+    rand = random.Random(0)
+    delays = DELAYS
+    counts = [0]
+
+    def reschedule(time):
+        counts[0] += 1
+        if counts[0] <= n_events:
+            return (time + rand.choice(delays), reschedule)
+
+    seq.clear()
+    for _ in range(n_pending):
+        seq.add((rand.uniform(0.0, 10.0), reschedule))
+    seq.run()
+    return counts[0]
+
+
+def _noop(time):
+    pass
+
+
+def preload(seq, events, bulk):
+    if bulk:
+        seq.addall(events)
+    else:
+        for event in events:
+            seq.add(event)
+
+
+def time_preload(kind, events, bulk, n_repeats=3):
+    # Best time to preload a new, empty sequencer.
+    # N.B. a new sequencer each time, so freeing the last lot is not counted.
+    return min(timed(preload, SEQUENCER_TYPES[kind](), events, bulk)[0]
+               for _ in range(n_repeats))
+
+
+def main_hold():
+    n_events = 20000
+    rows = []
+    for n_pending in (10, 100, 1000, 10000):
+        row = [n_pending]
+        for kind in ('list', 'heap', 'calendar'):
+            if kind == 'list' and n_pending > 1000:
+                # Far too slow.
+                row.append('-')
+                continue
+            seq = SEQUENCER_TYPES[kind]()
+            secs, n_done = timed(hold_model, seq, n_pending, n_events)
+            row.append('{:.0f}'.format(n_done / secs))
+        rows.append(row)
+    report('Events per second, with N pending events',
+           rows, ['N pending', 'list', 'heap', 'calendar'])
+
+
+def main_preload(n_events=100000):
+    rand = random.Random(0)
+    events = [(rand.uniform(0.0, 1.0e6), _noop) for _ in range(n_events)]
+    rows = []
+    for kind in ('list', 'heap', 'calendar'):
+        secs_bulk = time_preload(kind, events, bulk=True)
+        if kind == 'list':
+            # One-at-a-time is far too slow.
+            secs_single = speedup = '-'
+        else:
+            secs_single = time_preload(kind, events, bulk=False)
+            speedup = '{:.1f}'.format(secs_single / secs_bulk)
+            secs_single = '{:.3f}'.format(secs_single)
+        rows.append([kind, secs_single, '{:.3f}'.format(secs_bulk), speedup])
+    report('Seconds to preload {} events'.format(n_events),
+           rows, ['sequencer', 'add', 'addall', 'speedup'])
+
+
+def main():
+    main_hold()
+    main_preload()
+
+
+if __name__ == '__main__':
+    main()
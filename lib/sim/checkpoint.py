@@ -0,0 +1,85 @@
+"""
+Checkpoint and restore of complete simulation state.
+
+A Checkpoint captures the sequencer queue, all signal states and all
+internal device states, and can reinstate them any number of times, e.g. to
+rerun a simulation from a mid-point with varied stimulus.
+
+"""
+from sim.signal import Signal
+from sim.device import Device
+
+
+def connected_objects(objects):
+    """
+    Find all the devices and signals connected to some given ones.
+
+    Follows device outputs (and inner devices), and connections from signals
+    to device inputs.  So, given devices, this finds everything 'downstream'
+    of them, but stimulus signals must be included explicitly.
+
+    Returns (devices, signals) : lists, in order found.
+
+    """
+    devices, signals = [], []
+    seen = set()
+    todo = list(objects)
+    while todo:
+        obj = todo.pop(0)
+        if id(obj) in seen:
+            continue
+        if isinstance(obj, Signal):
+            seen.add(id(obj))
+            signals.append(obj)
+            for conn in obj.conns:
+                # N.B. a filtered connection wraps the actual call.
+                conn = getattr(conn, 'call', conn)
+                todo.append(getattr(conn, '__self__', None))
+                # Connections may also stand for fused devices.
+                todo.extend(getattr(conn, '_fused_devices', []))
+        elif isinstance(obj, Device):
+            seen.add(id(obj))
+            devices.append(obj)
+            for value in obj.__dict__.values():
+                if isinstance(value, (list, tuple)):
+                    todo.extend(value)
+                else:
+                    todo.append(value)
+    return devices, signals
+
+
+class Checkpoint(object):
+    """
+    A saved simulation state.
+
+    Args:
+
+    * sequencer (Sequencer):
+        the sequencer whose event queue is saved.
+    * objects (list of Device or Signal):
+        devices and signals to save.  Everything connected 'downstream' of
+        these is also included (see 'connected_objects').
+
+    """
+    def __init__(self, sequencer, objects):
+        self.sequencer = sequencer
+        devices, signals = connected_objects(objects)
+        self.devices = devices
+        self.signals = signals
+        self.save()
+
+    def save(self):
+        """Capture the current state (replacing any previous one)."""
+        self._sequencer_state = self.sequencer.save_state()
+        self._signal_states = [(sig.state, sig.previous)
+                               for sig in self.signals]
+        self._device_states = [dev.save_state() for dev in self.devices]
+
+    def restore(self):
+        """Reinstate the saved state."""
+        self.sequencer.restore_state(self._sequencer_state)
+        for sig, (state, previous) in zip(self.signals, self._signal_states):
+            sig.state = state
+            sig.previous = previous
+        for dev, state in zip(self.devices, self._device_states):
+            dev.restore_state(state)
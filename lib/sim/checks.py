@@ -0,0 +1,210 @@
+"""
+State checks, as used by the device state machines.
+
+Devices check their internal states with "okeq" and "okin", which raise a
+ValueError on failure.  The checking level can be lowered, to re-run an
+already validated configuration faster :
+
+    * 'full' : every check is made (the default).
+    * 'sampled' : only one check call in every "sample_every" is made.
+    * 'off' : checks do nothing.
+
+Device states may be coded as bits, with a StateSet to name them :  Then
+"okstate(state, allowed_mask, states)" checks a state with a single bitwise
+AND, and still reports failures with the readable state names.
+
+The level belongs to a thread :  Each thread starts with full checking,
+and changing the level only affects checks made in that thread.  So a
+Simulation with a 'check_level', which applies it while it runs, does not
+change the checks of other simulations running in other threads.
+
+"""
+from contextlib import contextmanager
+from itertools import count
+import threading
+
+CHECK_LEVELS = ('full', 'sampled', 'off')
+
+
+def _okeq_full(a, b):
+    if a != b:
+        msg = '!Check fail: {!r} != {!r}.'
+        msg = msg.format(a, b)
+        raise ValueError(msg)
+
+
+def _okin_full(a, bs):
+    if a not in bs:
+        msg = '!Check fail: {!r} not in {!r}.'
+        msg = msg.format(a, bs)
+        raise ValueError(msg)
+
+
+def _okstate_full(state, allowed, states):
+    if not state & allowed:
+        names = states.mask_names(allowed)
+        if len(names) == 1:
+            msg = '!Check fail: {!r} != {!r}.'
+            msg = msg.format(states.name(state), names[0])
+        else:
+            msg = '!Check fail: {!r} not in {!r}.'
+            msg = msg.format(states.name(state), names)
+        raise ValueError(msg)
+
+
+def _okeq_sampled(a, b):
+    if next(_THREAD.counter) % _THREAD.every == 0:
+        _okeq_full(a, b)
+
+
+def _okin_sampled(a, bs):
+    if next(_THREAD.counter) % _THREAD.every == 0:
+        _okin_full(a, bs)
+
+
+def _okstate_sampled(state, allowed, states):
+    if next(_THREAD.counter) % _THREAD.every == 0:
+        _okstate_full(state, allowed, states)
+
+
+def _okeq_off(a, b):
+    pass
+
+
+def _okin_off(a, bs):
+    pass
+
+
+def _okstate_off(state, allowed, states):
+    pass
+
+
+_CHECKERS = {
+    'full': {'okeq': _okeq_full, 'okin': _okin_full,
+             'okstate': _okstate_full},
+    'sampled': {'okeq': _okeq_sampled, 'okin': _okin_sampled,
+                'okstate': _okstate_sampled},
+    'off': {'okeq': _okeq_off, 'okin': _okin_off,
+            'okstate': _okstate_off},
+}
+
+# Default interval of sampled checking.
+SAMPLE_EVERY = 16
+
+
+class _ThreadChecks(threading.local):
+    # The checking level of a thread, and its check functions.
+    # Sampled checking counts all check calls, and makes every Nth one.
+    def __init__(self):
+        self.every = SAMPLE_EVERY
+        self.counter = count()
+        self.set_level('full')
+
+    def set_level(self, level):
+        self.level = level
+        checkers = _CHECKERS[level]
+        self.okeq = checkers['okeq']
+        self.okin = checkers['okin']
+        self.okstate = checkers['okstate']
+
+
+_THREAD = _ThreadChecks()
+
+
+def okeq(a, b):
+    """Check that a == b (at the current level)."""
+    _THREAD.okeq(a, b)
+
+
+def okin(a, bs):
+    """Check that a is in bs (at the current level)."""
+    _THREAD.okin(a, bs)
+
+
+def okstate(state, allowed, states):
+    """Check a state code is in an 'allowed' mask (at the current level)."""
+    _THREAD.okstate(state, allowed, states)
+
+
+def get_check_level():
+    """Return the checking level of the current thread."""
+    return _THREAD.level
+
+
+def set_check_level(level, sample_every=None):
+    """
+    Set the checking level of the current thread, one of CHECK_LEVELS.
+
+    For 'sampled', 'sample_every' sets the fraction of checks made.
+    Returns the previous level.
+
+    """
+    if level not in CHECK_LEVELS:
+        msg = 'Unknown check level {!r} : expected one of {}.'
+        raise ValueError(msg.format(level, CHECK_LEVELS))
+    if sample_every is not None:
+        if sample_every < 1:
+            msg = 'Check sample interval must be >= 1, got {!r}.'
+            raise ValueError(msg.format(sample_every))
+        _THREAD.every = int(sample_every)
+        _THREAD.counter = count()
+    previous = _THREAD.level
+    _THREAD.set_level(level)
+    return previous
+
+
+@contextmanager
+def check_level(level, sample_every=None):
+    """
+    Context manager to run with a given checking level.
+
+    Restores the previous level (and sample interval) afterwards.
+
+    """
+    previous_every = _THREAD.every
+    previous = set_check_level(level, sample_every)
+    try:
+        yield
+    finally:
+        if sample_every is None:
+            set_check_level(previous)
+        else:
+            set_check_level(previous, previous_every)
+
+
+class StateSet(object):
+    """
+    A set of named device states, each coded as a single bit.
+
+    As every state code is a power of 2, any group of states is coded as a
+    bitmask, and testing "state in group" is just "state & mask".
+
+    """
+    def __init__(self, *names):
+        self.names = names
+        self.codes = tuple(1 << i_state for i_state in range(len(names)))
+        self._code_names = dict(zip(self.codes, names))
+        self._name_codes = dict(zip(names, self.codes))
+
+    def __repr__(self):
+        return 'StateSet<{}>'.format(', '.join(self.names))
+
+    def code(self, name):
+        """Return the code of a named state."""
+        return self._name_codes[name]
+
+    def mask(self, *names):
+        """Return the bitmask of some named states."""
+        mask = 0
+        for name in names:
+            mask |= self._name_codes[name]
+        return mask
+
+    def name(self, code):
+        """Return the name of a state code (or the code, if not known)."""
+        return self._code_names.get(code, code)
+
+    def mask_names(self, mask):
+        """Return the names of all the states in a bitmask."""
+        return tuple(name for code, name in zip(self.codes, self.names)
+                     if code & mask)
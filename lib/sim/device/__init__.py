@@ -1,4 +1,6 @@
+import copy
 from functools import wraps
+from types import MethodType
 
 import sys
 
@@ -6,8 +8,39 @@ path = '/storage/emulated/0/qpython/'
 if path not in sys.path:
     sys.path.append(path)
 
+# State check utils (as assert disabled???), kept importable from here.
+from sim.checks import okeq, okin, okstate, StateSet
 from sim.sequencer import DEFAULT_SEQUENCER
-from sim.signal import Signal
+from sim.signal import Signal, _SIGNALS
+from sim.simulation import current_simulation, _ObjectRegistry
+
+
+# All devices, by simulation name and device name.
+# This is used to rebind pickled references to devices.
+_DEVICES = _ObjectRegistry('device')
+
+
+def find_device(name, simulation_name=None):
+    """
+    Get the device of the given name.
+
+    From the current Simulation, if any, or else the only one of that name in
+    the named simulation (None for no simulation).
+
+    """
+    simulation = current_simulation()
+    if simulation is not None:
+        device = simulation.devices.get(name)
+        if device is not None:
+            return device
+    return _DEVICES.find(name, simulation_name)
+
+
+def _copy_state_value(value):
+    # Copy containers, so a saved state is not changed by a running device.
+    if isinstance(value, (dict, list, set)):
+        value = copy.copy(value)
+    return value
 
 
 class Action(object):
@@ -18,7 +51,8 @@ class Action(object):
     
     Additional args/kwargs may be
     passed at calling time, if so
-    they come first.
+    they come first (and call-time kwargs
+    override stored ones of the same name).
     (At present, in practice, just
     	the "time" arg.)
 
@@ -49,22 +83,53 @@ class Action(object):
             args)
         return msg
 
+    def __reduce__(self):
+        # Pickle compactly, as device (name) + method name + args.
+        return (_rebuild_action,
+                (self.device, self.funcname, self.args, self.kwargs))
+
     def __call__(self, *args, **kwargs):
         args += self.args
-        kwargs = self.kwargs.copy()
-        kwargs.update(kwargs)
         # msg = 'call {} *{} **{}'
         # print msg. format (
         # 	  self._func, args, kwargs)
-        return self._func(*args, **kwargs)
+        if kwargs:
+            if self.kwargs:
+                # Call-time kwargs are added to the stored ones.
+                merged = self.kwargs.copy()
+                merged.update(kwargs)
+                kwargs = merged
+            return self._func(*args, **kwargs)
+        if self.kwargs:
+            return self._func(*args, **self.kwargs)
+        # The usual case : no kwargs, so no dictionary needed.
+        return self._func(*args)
+
+
+def _rebuild_action(device, funcname, args, kwargs):
+    return Action(device, funcname, *args, **kwargs)
 
 
 class Device(object):
     def __init__(self, name, sequencer=None):
         self.name = name
+        # Belong to the current simulation, if any.
+        simulation = current_simulation()
+        self._simulation_name = None
+        if simulation is not None:
+            sequencer = sequencer or simulation.seq
+            self._simulation_name = simulation.name
+            simulation.add_device(self)
         self.seq = sequencer or DEFAULT_SEQUENCER
         self._traces = set()
         self._hooks = {}
+        # Signals connected to inputs : (input_name, signal).
+        self._connections = []
+        _DEVICES.add(self, self._simulation_name)
+
+    def __reduce__(self):
+        # Pickle as a reference to a device of the same name (and simulation).
+        return (find_device, (self.name, self._simulation_name))
 
     def __str__(self):
         return '{}<{}>'.format(
@@ -74,9 +139,44 @@ class Device(object):
     def reset(self):
         pass  # Just to ensure we always have one.
 
-    def connect(self, input_name, signal):
+    # Instance attributes which are never part of the simulation state.
+    _nonstate_attrs = ('name', '_simulation_name', 'seq', '_traces',
+                       '_hooks', '_connections', '_fused')
+
+    # Set when the inputs have been fused into signal connections
+    # (see sim.netlist).
+    _fused = False
+
+    def _is_state_attr(self, name, value):
+        # State is any "plain data" : not signals, devices or methods.
+        if name in self._nonstate_attrs:
+            return False
+        if isinstance(value, (list, tuple)):
+            return not any(isinstance(x, (Signal, Device)) for x in value)
+        return not (isinstance(value, (Signal, Device)) or callable(value))
+
+    def save_state(self):
+        """
+        Return a copy of the internal state, which 'restore_state' reinstates.
+
+        This is all the instance attributes that are just data.  Containers
+        (e.g. a RAM content dictionary) are copied, but not their contents.
+
+        """
+        return dict((name, _copy_state_value(value))
+                    for name, value in self.__dict__.items()
+                    if self._is_state_attr(name, value))
+
+    def restore_state(self, state):
+        for name, value in state.items():
+            setattr(self, name, _copy_state_value(value))
+
+    def connect(self, input_name, signal, mask=None, shift=0, edge=None):
+        # Optional bit selection + edge filter : see Signal.add_connection.
         input_method = getattr(self, input_name)
-        signal.add_connection(input_method)
+        signal.add_connection(input_method,
+                              mask=mask, shift=shift, edge=edge)
+        self._connections.append((input_name, signal))
 
     def add_output(self, name, start_value=None):
         full_name = '{}.{}'.format(
@@ -87,8 +187,16 @@ class Device(object):
 
     def act(self, time, name, *args, **kwargs):
         # Schedule a future action, calling a method on the device.
-        self.seq.add(
-            (time, Action(self, name, *args, **kwargs)))
+        # Returns the scheduled event, which can be passed to 'cancel'.
+        if kwargs:
+            return self.seq.add(
+                (time, Action(self, name, *args, **kwargs)))
+        # Without kwargs, just schedule the (bound) method.
+        return self.seq.add_call(time, getattr(self, name), args)
+
+    def cancel(self, event):
+        # Withdraw a scheduled action, if it has not yet happened.
+        return self.seq.cancel(event)
 
     @staticmethod
     def _input_common(self, name, time, signal):
@@ -106,12 +214,21 @@ class Device(object):
 
     @staticmethod
     def input(f):
-        name = f.__name__
+        # Mark an input method.
+        # N.B. this does not wrap the method :  Hooks and tracing are
+        # only installed, per-instance, when used (see '_instrument').
+        f._device_call_type = 'input'
+        return f
+
+    @staticmethod
+    def _input_wrapper(method):
+        # Wrap an input method with hooks + tracing.
+        name = method.__name__
 
-        @wraps(f)
+        @wraps(method.__func__)
         def _wrapper(self, time, signal):
             self._input_common(self, name, time, signal)
-            return f(self, time, signal)
+            return method(time, signal)
 
         return _wrapper
 
@@ -136,15 +253,81 @@ class Device(object):
 
     @staticmethod
     def action(f):
-        name = f.__name__
+        # Mark an action method.
+        # N.B. like 'input', does not wrap the method.
+        f._device_call_type = 'action'
+        return f
 
-        @wraps(f)
+    @staticmethod
+    def _action_wrapper(method):
+        # Wrap an action method with hooks + tracing.
+        name = method.__name__
+
+        @wraps(method.__func__)
         def _wrapper(self, time, *args, **kwargs):
             self._action_common(self, name, time, *args, **kwargs)
-            return f(self, time, *args, **kwargs)
+            return method(time, *args, **kwargs)
 
         return _wrapper
 
+    def _instrument(self, name):
+        # Install or remove the hooks + tracing wrapper of an input or action
+        # method, as needed.
+        # The wrapper is an instance attribute, overriding the plain method.
+        method = getattr(self, name)
+        plain_method = getattr(method, '_plain_method', method)
+        call_type = getattr(plain_method, '_device_call_type', None)
+        if call_type is None:
+            # Not an input or action : hooks + traces do nothing.
+            return
+        if call_type == 'input' and self._fused:
+            msg = '{} : cannot hook or trace input "{}" of a fused device.'
+            raise ValueError(msg.format(self.name, name))
+        if self._hooks.get(name) or name in self._traces:
+            if method is not plain_method:
+                # Already instrumented.
+                return
+            if call_type == 'input':
+                wrapper = self._input_wrapper(plain_method)
+            else:
+                wrapper = self._action_wrapper(plain_method)
+            wrapper._plain_method = plain_method
+            new_method = MethodType(wrapper, self)
+            setattr(self, name, new_method)
+        else:
+            if method is plain_method:
+                # Not instrumented.
+                return
+            new_method = plain_method
+            if getattr(type(self), name, None) is plain_method.__func__:
+                delattr(self, name)
+            else:
+                # A per-instance method, e.g. a SigJoin input.
+                setattr(self, name, plain_method)
+        self._repoint(name, method, new_method)
+
+    def _repoint(self, name, old_method, new_method):
+        # Re-point all the calls to a method, which were made with the old
+        # one :  Signal connections (however made), and queued events and
+        # updates, including Actions.
+        # N.B. this searches all the signals, but is only for hooks + traces.
+        for signal in _SIGNALS.objects():
+            signal.replace_connection(old_method, new_method)
+
+        def repointed(call):
+            if call == old_method:
+                return new_method
+            if (call.__class__ is Action and call.device is self and
+                    call.funcname == name):
+                call._func = new_method
+            return call
+
+        seq = self.seq
+        for event in seq._queued_events():
+            event.call = repointed(event.call)
+        seq._updates[:] = [(repointed(call), args)
+                           for call, args in seq._updates]
+
     def hook(self, name, call):
         # Works for both inputs and actions, but call signatures are different
         # input_hook(device, name, time, signal
@@ -152,12 +335,14 @@ class Device(object):
         hooks = self._hooks.get(name, [])
         hooks.append(call)
         self._hooks[name] = hooks
+        self._instrument(name)
 
     def unhook(self, name, call):
         hooks = self._hooks.get(name, [])
         if call in hooks:
             hooks.remove(call)
             self._hooks[name] = hooks
+        self._instrument(name)
 
     def trace(self, name, on=True):
         # Works for both inputs and actions, but messages are different
@@ -166,6 +351,7 @@ class Device(object):
             self._traces.add(name)
         else:
             self._traces.remove(name)
+        self._instrument(name)
 
     def untrace(self, name):
         self.trace(name, False)
@@ -182,9 +368,7 @@ class ClockTick(Device):
     def start(self, time, signal):
         # self._trace_input('start', time, signal)
         # Make a first tick happen.
-        self.seq.add(
-            (time,
-             Action(self, 'tick')))
+        self.act(time, 'tick')
 
     @Device.action
     def tick(self, time):
@@ -192,18 +376,3 @@ class ClockTick(Device):
         self.output.set(time, 'Tick!')
         return (time + self.period,
                 Action(self, 'tick'))
-
-
-# utils, as assert disabled???
-def okeq(a, b):
-    if a != b:
-        msg = '!Check fail: {!r} != {!r}.'
-        msg = msg.format(a, b)
-        raise ValueError(msg)
-
-
-def okin(a, bs):
-    if a not in bs:
-        msg = '!Check fail: {!r} not in {!r}.'
-        msg = msg.format(a, bs)
-        raise ValueError(msg)
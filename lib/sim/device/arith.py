@@ -1,10 +1,26 @@
 # Accumulator and adder arithmetic
 
+from bisect import bisect_right
+
 from sim.signal import SIG_UNDEF, Signal
-from sim.device import okeq, okin
+from sim.device import okeq, okin, okstate, StateSet
 from sim.device import Device, Action
 from sim.device.pseudo_devices import sig_join, sig_bitslice, SigSendCopy
 
+
+# CounterOnebit states, coded as bits (see sim.checks.StateSet).
+ONEBIT_STATES = StateSet('idle', 'idle-with-clearing', 'value-toggling',
+                         'carry-propagating', 'dropping', 'controls-changing')
+(IDLE, IDLE_WITH_CLEARING, VALUE_TOGGLING,
+ CARRY_PROPAGATING, DROPPING, CONTROLS_CHANGING) = ONEBIT_STATES.codes
+# States which accept an input.
+ONEBIT_IDLE_ANY = IDLE | IDLE_WITH_CLEARING
+# States which accept a control change.
+ONEBIT_CONTROL_OK = IDLE | IDLE_WITH_CLEARING | CONTROLS_CHANGING
+# States in which a dropped '1' can complete.
+ONEBIT_DROP_OK = CONTROLS_CHANGING | DROPPING
+
+
 class CounterOnebit(Device):
     """
     A one-bit store with increment-toggle, carry-out and async clear.
@@ -69,7 +85,7 @@ class CounterOnebit(Device):
         self.reset()
 
     def reset(self):
-        self._state = 'idle'
+        self._state = IDLE
         self._value = 0
         self._or_enabled = False
         self._clear_enabled = False
@@ -82,10 +98,10 @@ class CounterOnebit(Device):
         if signal.state == 0:
             # Ignore, in this case
             return
-        okin(self._state, ['idle', 'idle-with-clearing'])
+        okstate(self._state, ONEBIT_IDLE_ANY, ONEBIT_STATES)
         self.output.set(time, SIG_UNDEF)
-        if self._state == 'idle':
-            self._state = 'value-toggling'
+        if self._state == IDLE:
+            self._state = VALUE_TOGGLING
             toggle_delay = [self._t_0_1, self._t_1_0][self._value]
             if self._or_enabled:
                 # In this mode, any input leaves us at '1'
@@ -95,39 +111,39 @@ class CounterOnebit(Device):
             else:
                 self._value = 1 - self._value  # invert --> output after delay
             self.act(time + toggle_delay, '_toggle_output')
-        elif self._state == 'idle-with-clearing':
-            self._state = 'dropping'  # Block control changes while dropping.
+        elif self._state == IDLE_WITH_CLEARING:
+            self._state = DROPPING  # Block control changes while dropping.
             self.act(time + self._t_0_1 + self._t_drop, '_dropped')
         else:
             assert False  # should never be able to get here.
 
     @Device.action
     def _toggle_output(self, time):
-        okeq(self._state, 'value-toggling')
+        okstate(self._state, VALUE_TOGGLING, ONEBIT_STATES)
         self.output.set(time, self._value)
         if self._value == 1:
             # New state is 1, no carry-out.
-            self._state = 'idle'
+            self._state = IDLE
         else:
             # Must also send a carry, before we are stable again.
-            self._state = 'carry-propagating'
+            self._state = CARRY_PROPAGATING
             self.act(time + self._t_carry, '_carry_out')
 
     def _carry_out(self, time):
-        okeq(self._state, 'carry-propagating')
+        okstate(self._state, CARRY_PROPAGATING, ONEBIT_STATES)
         self.x_carry_out.set(time, 1)
-        self._state = 'idle'
+        self._state = IDLE
 
     @Device.input
     def enable_or(self, time, signal):
         or_value = signal.state != 0
         if or_value == self._or_enabled:
             return
-        okin(self._state, ['idle', 'idle-with-clearing', 'controls-changing'])
+        okstate(self._state, ONEBIT_CONTROL_OK, ONEBIT_STATES)
         okeq(self._or_changing, False)
         # Internal stored-value and output are unaffected.
         # We just need a quiet moment to register the control change.
-        self._state = 'controls-changing'
+        self._state = CONTROLS_CHANGING
         # record new value of control.
         self._or_enabled = or_value
         # prevent overlapping change on same input.
@@ -141,9 +157,9 @@ class CounterOnebit(Device):
         clear_value = signal.state != 0
         if clear_value == self._clear_enabled:
             return
-        okin(self._state, ['idle', 'idle-with-clearing', 'controls-changing'])
+        okstate(self._state, ONEBIT_CONTROL_OK, ONEBIT_STATES)
         okeq(self._clear_changing, False)
-        self._state = 'controls-changing'
+        self._state = CONTROLS_CHANGING
         # record new value of control.
         self._clear_enabled = clear_value
         # prevent overlapping change on same input.
@@ -159,7 +175,7 @@ class CounterOnebit(Device):
 
     @Device.action
     def _control_changed(self, time):
-        okeq(self._state, 'controls-changing')
+        okstate(self._state, CONTROLS_CHANGING, ONEBIT_STATES)
         # countdown n control changes to end of change period.
         self._n_control_changes_due -= 1
         if self._n_control_changes_due == 0:
@@ -169,20 +185,20 @@ class CounterOnebit(Device):
             self._clear_changing = False
             # Return to 'idle' or 'clearing' state.
             if self._clear_enabled:
-                self._state = 'idle-with-clearing'
+                self._state = IDLE_WITH_CLEARING
             else:
-                self._state = 'idle'
+                self._state = IDLE
 
     @Device.action
     def _dropped(self, time):
         # Emit a dropped '1' as a carry (and stabilise stored value = 0).
-        okin(self._state, ['controls-changing', 'dropping'])
+        okstate(self._state, ONEBIT_DROP_OK, ONEBIT_STATES)
         # N.B. should NOT occur in 'idle' state.
         # N.B. no state change unless 'dropping'
-        if self._state == 'dropping':
+        if self._state == DROPPING:
             # A special state, just to block control changes during 'dropping',
             # only entered when input arrives during 'idle-with-clearing'.
-            self._state = 'idle-with-clearing'
+            self._state = IDLE_WITH_CLEARING
         # 'ELSE' get here while clear goes 0 to 1 --> no state change.
 
         # Set stored-value stable.
@@ -199,14 +215,19 @@ class Counter(Device):
     Inputs: 'input', 'clear'
     Outputs: 'output', 'x_carry_out'
 
+    If 'lazy_output' is set, the 'output' is lazy (see SigJoin) :  It only
+    generates events when something is connected to it.
+
     """
-    def __init__(self, name, n_bits, onebit_kwargs=None, *args, **kwargs):
+    def __init__(self, name, n_bits, onebit_kwargs=None, lazy_output=False,
+                 *args, **kwargs):
         super(Counter, self).__init__(name, *args, **kwargs)
         self.n_bits = n_bits
         if onebit_kwargs is None:
             onebit_kwargs = {}
         self._bit_counters = [
-            CounterOnebit('{}__bit:{}'.format(name, i_bit), **onebit_kwargs)
+            CounterOnebit('{}__bit:{}'.format(name, i_bit),
+                          sequencer=self.seq, **onebit_kwargs)
             for i_bit in range(n_bits)
         ]
         # inputs: 'input', 'x_clear'
@@ -219,9 +240,14 @@ class Counter(Device):
         self._output_combined = sig_join(
             '{}_combined_output'.format(name),
             [(bit_counter.output, 1)
-             for bit_counter in self._bit_counters[::-1]])
+             for bit_counter in self._bit_counters[::-1]],
+            sequencer=self.seq, lazy=lazy_output)
         self.output = self._output_combined.output
-        self._carry_constant_signal = Signal('_carry_value', start_state=1)
+        self._carry_constant_signal = Signal('{}__carry_value'.format(name),
+                                             start_state=1)
+        # Signal to send each bit of an input value to its bit counter.
+        self._bit_input_signal = Signal('{}__bit_input'.format(name))
+        self._clearing = False
         self._carry_gates = [None] * n_bits
         # self.add_output('x_carry_out')
 
@@ -236,7 +262,7 @@ class Counter(Device):
                 carry_name = '_{}_carry:{}'.format(name, i_bit)
             else:
                 carry_name = '{}__x_carry_out'.format(name)
-            carry_gate = SigSendCopy(carry_name)
+            carry_gate = SigSendCopy(carry_name, sequencer=self.seq)
             self._carry_gates[i_bit] = carry_gate
             carry_gate.connect('input', self._carry_constant_signal)
             # Note carry-gates ALSO need an initial signal to initialise state.
@@ -254,17 +280,431 @@ class Counter(Device):
 
     def input(self, time, signal):
         # Split input value into bits and send to internal bit counter inputs.
-        dummy_signal = Signal('dummy')
+        bit_signal = self._bit_input_signal
         for i_bit in range(self.n_bits):
             value = signal.state & (1 << i_bit)
-            dummy_signal.set(time, value)
-            self._bit_counters[i_bit].input(time, dummy_signal)
+            bit_signal.set(time, value)
+            self._bit_counters[i_bit].input(time, bit_signal)
 
     def clear(self, time, signal):
         # Set the common carry signal to block carry-over while clearing, and
         # enable it during 'normal' operation.
-        enable_carries = 0 if (signal.state != 0) else 1
-        self._carry_constant_signal.set(time, enable_carries)
+        self._clearing = signal.state != 0
+        self._carry_constant_signal.set(time,
+                                        1 if self._carries_enabled() else 0)
         # Send the clear signal (new value) to all the bit-counters.
         for i_bit in range(self.n_bits):
             self._bit_counters[i_bit].clear(time, signal)
+
+    def _carries_enabled(self):
+        # Whether carries pass between bits (and to the carry-out).
+        return not self._clearing
+
+
+class Accumulator(Counter):
+    """
+    A multi-bit accumulator :  A Counter, with extra modes.
+
+    Inputs: 'input', 'clear', 'carry_in', 'enable_or', 'disable_carry'
+    Outputs: 'output', 'x_carry_out'
+
+    An 'input' value is added to the stored one, and a 'carry_in' event adds
+    1, so "add-with-carry" is an input followed by a carry-in.
+    The modes are set by the instruction control bits :
+
+    * 'enable_or' (IR_XTG) : bits are not toggled back to 0, so that adding
+      makes an OR (and no carries).
+    * 'disable_carry' (IR_XCY) : carries between bits are blocked, so that
+      adding makes an XOR.  The carry-out then sends 0.
+
+    As for the one-bit 'enable_or', a mode change must come when the bits
+    are idle, and inputs must wait for the change period ('t_eor_onoff').
+
+    """
+    def __init__(self, *args, **kwargs):
+        super(Accumulator, self).__init__(*args, **kwargs)
+        self._carry_disabled = False
+
+    @Device.input
+    def carry_in(self, time, signal):
+        # Add 1, i.e. a carry into the lowest bit.
+        if signal.state != 0:
+            self._bit_counters[0].input(time, signal)
+
+    @Device.input
+    def enable_or(self, time, signal):
+        for bit_counter in self._bit_counters:
+            bit_counter.enable_or(time, signal)
+
+    @Device.input
+    def disable_carry(self, time, signal):
+        self._carry_disabled = signal.state != 0
+        self._carry_constant_signal.set(time,
+                                        1 if self._carries_enabled() else 0)
+
+    def _carries_enabled(self):
+        return not (self._clearing or self._carry_disabled)
+
+
+# Default CounterOnebit timings (as its keyword arguments).
+_ONEBIT_TIMINGS = {
+    't_toggle_0_to_1': 3.,
+    't_toggle_1_to_0': 3.,
+    't_out_2_carry': 1.,
+    't_clear_2_carry': 2.,
+    't_clear_onoff': 4.,
+    't_eor_onoff': 2.,
+}
+
+
+def _in_progress(time, scheduled, end):
+    # Whether an operation, ending as 'end' = (time, scheduled), is still in
+    # progress for an event at 'time', which was scheduled at 'scheduled'.
+    # At the same time, the event scheduled first comes first (or, if both
+    # are scheduled together, the new event).
+    end_time, end_scheduled = end
+    return time < end_time or (time == end_time and
+                               scheduled <= end_scheduled)
+
+
+class BehaviouralCounter(Device):
+    """
+    A multi-bit counter, computed directly instead of from one-bit devices.
+
+    Equivalent to a 'Counter' with the same 'onebit_kwargs' :  It takes the
+    same inputs, and makes the same state checks, but each input is worked
+    through all the bits at once, from the one-bit timings.
+    Only the results are scheduled as events :  The 'output' goes undefined
+    when an input arrives, and is set when all the bits have settled, while
+    'x_carry_out' events are exactly those of the structural counter.
+    Unlike a Counter, the output does not show the intermediate values of a
+    carry ripple (it stays undefined).
+
+    An input which arrives while a carry is still rippling is also handled,
+    by re-working all the inputs since the counter was last quiet.
+    Events at the same time are taken in the order a Counter would schedule
+    them (with all inputs scheduled in advance).
+    Failed state checks are raised when an input is received, so they may
+    show a different bit or state from the Counter.
+
+    Inputs: 'input', 'clear'
+    Outputs: 'output', 'x_carry_out'
+
+    """
+    def __init__(self, name, n_bits, onebit_kwargs=None,
+                 *args, **kwargs):
+        super(BehaviouralCounter, self).__init__(name, *args, **kwargs)
+        self.n_bits = n_bits
+        timings = _ONEBIT_TIMINGS.copy()
+        if onebit_kwargs:
+            unknown = sorted(set(onebit_kwargs) - set(timings))
+            if unknown:
+                msg = '{} : unknown one-bit timings {}.'
+                raise TypeError(msg.format(name, unknown))
+            timings.update(onebit_kwargs)
+        if timings['t_clear_onoff'] < timings['t_clear_2_carry']:
+            msg = (
+                't_clear_onoff({}) < t_clear_2_carry({}) : disallowed, as '
+                'clear must complete before return to idle mode.')
+            raise ValueError(msg.format(timings['t_clear_onoff'],
+                                        timings['t_clear_2_carry']))
+        self._t_0_1 = timings['t_toggle_0_to_1']
+        self._t_1_0 = timings['t_toggle_1_to_0']
+        self._t_carry = timings['t_out_2_carry']
+        self._t_drop = timings['t_clear_2_carry']
+        self._t_clear = timings['t_clear_onoff']
+        self._t_eor = timings['t_eor_onoff']
+        self.add_output('output', start_value=0)
+        self.add_output('x_carry_out')
+        self.reset()
+
+    def reset(self):
+        # Value and modes when last quiet, and the inputs since then, as
+        # (time, kind, value), where 'kind' is the input name.
+        self._quiet_value = 0
+        self._quiet_modes = {'clear': False, 'enable_or': False,
+                             'disable_carry': False}
+        self._inputs = []
+        # Results of all those inputs.
+        self._value = 0
+        self._modes = self._quiet_modes.copy()
+        self._quiet_time = None
+        self._undefined_time = None
+        self._settle_event = None
+        self._carry_events = []
+
+    @Device.input
+    def input(self, time, signal):
+        value = signal.state & ((1 << self.n_bits) - 1)
+        if value:
+            self._add_input(time, 'input', value)
+
+    @Device.input
+    def clear(self, time, signal):
+        self._set_mode(time, 'clear', signal)
+
+    def _set_mode(self, time, kind, signal):
+        mode = signal.state != 0
+        if mode != self._modes[kind]:
+            self._add_input(time, kind, mode)
+
+    def _add_input(self, time, kind, value):
+        if self._inputs and time > self._quiet_time:
+            # All quiet since the previous inputs : start afresh.
+            self._quiet_value = self._value
+            self._quiet_modes = self._modes
+            self._inputs = []
+        self._inputs.append((time, kind, value))
+        results = None
+        if len(self._inputs) == 1 and kind == 'input' and \
+                not any(self._quiet_modes.values()):
+            results = self._work_count(time, value)
+        if results is None:
+            results = self._work_inputs()
+        (self._value, self._modes, self._quiet_time,
+         undefined_times, settle_time, carries) = results
+
+        # Replace any carry-outs still to come.
+        carry_events = []
+        for event in self._carry_events:
+            if event.time > time:
+                self.cancel(event)
+            elif event.pending:
+                carry_events.append(event)
+        carry_events.extend(self.act(carry_time, '_carry_out', carry_value)
+                            for carry_time, carry_value in carries
+                            if carry_time > time)
+        self._carry_events = carry_events
+
+        # The output goes undefined now, and is set when all bits settle.
+        if time in undefined_times and self._undefined_time != time:
+            self._undefined_time = time
+            self.seq.add_update(time, self._output_undefined)
+        event = self._settle_event
+        if event is not None and event.pending and \
+                event.time != settle_time:
+            self.cancel(event)
+        if settle_time is not None and settle_time > time and \
+                (event is None or not event.pending):
+            self._settle_event = self.seq.add_update(settle_time,
+                                                     self._output_settled)
+
+    def _work_count(self, time, input_value):
+        # Work out the results of a single count, from quiet, in the plain
+        # 'add' mode :  The usual case, which is worked in closed form.
+        # Returns the same as '_work_inputs', or None if any bit gets both an
+        # input and a carry (which needs the full treatment).
+        t_0_1, t_1_0, t_carry = self._t_0_1, self._t_1_0, self._t_carry
+        value = self._quiet_value
+        undefined_times = set((time,))
+        settle_time = quiet_time = time
+        # Time of the carry into the current bit.
+        carry = None
+        bit = 1
+        for _ in range(self.n_bits):
+            if input_value & bit:
+                if carry is not None:
+                    return None
+                arrival = time
+            elif carry is not None:
+                arrival = carry
+                undefined_times.add(arrival)
+            elif input_value < bit:
+                break
+            else:
+                bit <<= 1
+                continue
+            if value & bit:
+                toggle_time = arrival + t_1_0
+                carry = quiet_time = toggle_time + t_carry
+            else:
+                toggle_time = arrival + t_0_1
+                carry = None
+                quiet_time = max(quiet_time, toggle_time)
+            value ^= bit
+            settle_time = max(settle_time, toggle_time)
+            bit <<= 1
+        carries = [] if carry is None else [(carry, 1)]
+        return (value, self._quiet_modes, quiet_time, undefined_times,
+                settle_time, carries)
+
+    def _work_inputs(self):
+        # Work out the results of all the inputs since the last quiet time,
+        # one bit at a time, as each bit depends only on the inputs and the
+        # carries from the bit below.
+        # Returns (value, modes, quiet_time, undefined_times, settle_time,
+        # carries), where 'undefined_times' are times when a bit output goes
+        # undefined, 'settle_time' is the last time a bit output is set, and
+        # 'carries' are the carry-outs, as (time, value).
+        #
+        # Each arrival and operation end also has the time its event would
+        # be scheduled in a Counter, which decides the order of events at
+        # the same time.  Inputs are taken to be scheduled before anything.
+        t_0_1, t_1_0, t_carry = self._t_0_1, self._t_1_0, self._t_carry
+        t_drop = self._t_drop
+        t_control = {'clear': self._t_clear, 'enable_or': self._t_eor}
+        never = float('-inf')
+        modes = self._quiet_modes.copy()
+        # Changes of the carry gates, as (time, enabled) :  Carries pass
+        # only when not clearing, and not disabled.
+        gate_enabled = not (modes['clear'] or modes['disable_carry'])
+        gate_times, gate_values = [], []
+        # Bits with any inputs (all of them, for a mode change).
+        input_bits = 0
+        for time, kind, value in self._inputs:
+            if kind == 'input':
+                input_bits |= value
+            else:
+                input_bits = -1
+                modes[kind] = value
+                gate_times.append(time)
+                gate_values.append(
+                    not (modes['clear'] or modes['disable_carry']))
+
+        def gate_at(time):
+            i_change = bisect_right(gate_times, time)
+            return gate_values[i_change - 1] if i_change else gate_enabled
+
+        value = 0
+        undefined_times = set()
+        set_times = []
+        quiet_time = self._inputs[0][0]
+        # Carries into the current bit, and out of it, as (time, scheduled).
+        carries_in = []
+        carries_out = []
+        for i_bit in range(self.n_bits):
+            bit = 1 << i_bit
+            bit_value = self._quiet_value & bit
+            carries_out = []
+            if not carries_in and not input_bits & -bit:
+                # This and all higher bits are unchanged.
+                value |= self._quiet_value & -bit
+                break
+            if not carries_in and not input_bits & bit:
+                value |= bit_value
+                continue
+            clearing = self._quiet_modes['clear']
+            or_enabled = self._quiet_modes['enable_or']
+            # Inputs + carries-in, in event order.
+            arrivals = [(time, never, i_input, kind, mode)
+                        for i_input, (time, kind, mode)
+                        in enumerate(self._inputs)
+                        if kind in ('clear', 'enable_or') or
+                        (kind == 'input' and mode & bit)]
+            arrivals.extend((time, scheduled, 0, 'input', None)
+                            for time, scheduled in carries_in)
+            arrivals.sort()
+            # Ends of the current operation (toggle + maybe carry, or drop),
+            # and of any control changes, as (time, scheduled).
+            busy_end = toggle_end = control_end = (never, never)
+            dropping = False
+            # Controls changed since the control changes began.
+            changing = set()
+            for time, scheduled, _, kind, mode in arrivals:
+                # The one-bit state at this time.
+                in_control_change = _in_progress(time, scheduled,
+                                                 control_end)
+                if in_control_change:
+                    state = CONTROLS_CHANGING
+                elif _in_progress(time, scheduled, busy_end):
+                    if dropping:
+                        state = DROPPING
+                    elif _in_progress(time, scheduled, toggle_end):
+                        state = VALUE_TOGGLING
+                    else:
+                        state = CARRY_PROPAGATING
+                elif clearing:
+                    state = IDLE_WITH_CLEARING
+                else:
+                    state = IDLE
+                if kind == 'input':
+                    okstate(state, ONEBIT_IDLE_ANY, ONEBIT_STATES)
+                    undefined_times.add(time)
+                    if clearing:
+                        # The input is dropped.
+                        dropping = True
+                        busy_end = (time + t_0_1 + t_drop, time)
+                        carries_out.append(busy_end)
+                        set_times.append(busy_end[0])
+                    else:
+                        dropping = False
+                        toggle_time = time + (t_1_0 if bit_value else t_0_1)
+                        toggle_end = busy_end = (toggle_time, time)
+                        if or_enabled:
+                            bit_value = bit
+                        else:
+                            bit_value ^= bit
+                        if not bit_value:
+                            busy_end = (toggle_time + t_carry, toggle_time)
+                            carries_out.append(busy_end)
+                        set_times.append(toggle_time)
+                elif mode != (clearing if kind == 'clear' else or_enabled):
+                    okstate(state, ONEBIT_CONTROL_OK, ONEBIT_STATES)
+                    if not in_control_change:
+                        changing = set()
+                    okeq(kind in changing, False)
+                    changing.add(kind)
+                    control_end = max(control_end,
+                                      (time + t_control[kind], time))
+                    if kind == 'enable_or':
+                        or_enabled = mode
+                    else:
+                        clearing = mode
+                        if clearing and bit_value:
+                            # Drop a stored '1'.
+                            bit_value = 0
+                            undefined_times.add(time)
+                            carries_out.append((time + t_drop, time))
+                            set_times.append(time + t_drop)
+            value |= bit_value
+            quiet_time = max(quiet_time, busy_end[0], control_end[0])
+            # Carries pass to the next bit only while the carry gate is
+            # enabled (otherwise, they send a '0', which is ignored).
+            carries_in = [carry for carry in carries_out
+                          if gate_at(carry[0])]
+        # Carries from the top bit are the carry-outs, with the carry gate
+        # state as their value.
+        carries = sorted((time, 1 if gate_at(time) else 0)
+                         for time, _ in carries_out)
+        settle_time = None
+        if set_times:
+            settle_time = max(set_times)
+            quiet_time = max(quiet_time, settle_time)
+        return (value, modes, quiet_time, undefined_times, settle_time,
+                carries)
+
+    @Device.action
+    def _output_undefined(self, time):
+        if self.output.state != SIG_UNDEF:
+            self.output.set(time, SIG_UNDEF)
+
+    @Device.action
+    def _output_settled(self, time):
+        self.output.set(time, self._value)
+
+    @Device.action
+    def _carry_out(self, time, value):
+        self.x_carry_out.set(time, value)
+
+
+class BehaviouralAccumulator(BehaviouralCounter):
+    """
+    A multi-bit accumulator, computed directly :  Equivalent to an
+    'Accumulator', as a BehaviouralCounter is to a Counter.
+
+    Inputs: 'input', 'clear', 'carry_in', 'enable_or', 'disable_carry'
+    Outputs: 'output', 'x_carry_out'
+
+    """
+    @Device.input
+    def carry_in(self, time, signal):
+        if signal.state != 0:
+            self._add_input(time, 'input', 1)
+
+    @Device.input
+    def enable_or(self, time, signal):
+        self._set_mode(time, 'enable_or', signal)
+
+    @Device.input
+    def disable_carry(self, time, signal):
+        self._set_mode(time, 'disable_carry', signal)
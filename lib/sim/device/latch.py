@@ -4,8 +4,15 @@ sys.path.append(
     '/storage/emulated/0/qpython/')
 
 from sim.signal import SIG_UNDEF
-from sim.device import okeq, okin
-from sim.device import Device, Action
+from sim.device import okstate, StateSet
+from sim.device import Device
+
+
+# Device states, coded as bits (see sim.checks.StateSet).
+LATCH_STATES = StateSet('ready', 'capturing', 'set', 'clearing')
+READY, CAPTURING, SET, CLEARING = LATCH_STATES.codes
+# States which allow a clear.
+CLEARABLE = READY | SET
 
 
 class PulseLatch(Device):
@@ -31,39 +38,38 @@ class PulseLatch(Device):
         self.reset()
 
     def reset(self):
-        self._state = 'ready'
+        self._state = READY
 
     @Device.input
     def input(self, time, signal):
         # assert self._state == 'ready'
-        okeq(self._state, 'ready')
+        okstate(self._state, READY, LATCH_STATES)
         if signal.state == 0:
             # Ignore, in this case
             return
-        self._state = 'capturing'
+        self._state = CAPTURING
         self.output.set(time, SIG_UNDEF)
         self.act(time + self._t_delay, '_output_update', signal.state)
         self.act(time + self._t_d2c, '_latched')
 
     @Device.input
     def clr(self, time, signal):
-        okin(self._state,
-             ['ready', 'set'])
-        self._state = 'clearing'
+        okstate(self._state, CLEARABLE, LATCH_STATES)
+        self._state = CLEARING
         self.output.set(time, SIG_UNDEF)
         self.act(time + self._t_delay, '_output_update', 0)
         self.act(time + self._t_c2d,'_cleared')
 
     @Device.action
     def _latched(self, time):
-        okeq(self._state, 'capturing')
-        self._state = 'set'
+        okstate(self._state, CAPTURING, LATCH_STATES)
+        self._state = SET
         # now captured, wait for a clr signal
 
     @Device.action
     def _cleared(self, time):
-        okeq(self._state, 'clearing')
-        self._state = 'ready'
+        okstate(self._state, CLEARING, LATCH_STATES)
+        self._state = READY
 
     @Device.action
     def _output_update(self, time, state):
@@ -4,9 +4,9 @@ sys.path.append(
     '/storage/emulated/0/qpython/')
 
 from types import MethodType
-from sim.signal import SIG_UNDEF
+from sim.signal import SIG_UNDEF, LazySignal
 from sim.device import okeq, okin
-from sim.device import Device, Action
+from sim.device import Device
 
 
 class SigBitslice(Device):
@@ -38,9 +38,33 @@ class SigBitslice(Device):
         # (e.g. typically, SIG_UNDEF)
         self.output.set(time, val)
 
+    def _fuse(self, inline=False):
+        # Plain calls to replace the input connections (see sim.netlist).
+        # N.B. a bitslice is always evaluated inline.
+        fused_input = _fused_bitslices([(self.output, self._i_bit_0,
+                                         self._mask)])
+        return {'input': fused_input}
+
+
+def _fused_bitslices(slices):
+    # Make one connection call, doing the work of several SigBitslice
+    # inputs (all connected to the same signal), in order.
+    def fused_input(time, signal):
+        state = signal.state
+        is_number = isinstance(state, (int, float))
+        for output, i_bit_0, mask in slices:
+            val = state
+            if is_number:
+                val >>= i_bit_0
+                val &= mask
+            output.set(time, val)
+    fused_input._bitslices = slices
+    return fused_input
+
 
 def sig_bitslice(sig, ibit0,
-                 nbits=1, name=None):
+                 nbits=1, name=None,
+                 sequencer=None):
     if name is None:
         name = '{}:{}'.format(
             sig.name, ibit0)
@@ -48,7 +72,8 @@ def sig_bitslice(sig, ibit0,
         name += '..{}'.format(
             ibit0 + nbits - 1)
     result = SigBitslice(
-        name, ibit0, nbits)
+        name, ibit0, nbits,
+        sequencer=sequencer)
     result.connect('input', sig)
     return result
 
@@ -62,18 +87,30 @@ class SigJoin(Device):
     is set.
     Input (methods) are created and
     added as required, by 'add_input'.
-    
+
+    If 'lazy' is set, the output is a LazySignal :  While nothing is
+    connected to it, input changes do not cause output events, and the
+    output value is only computed (and cached) when read.
+
     """
 
     def __init__(self, name,
                  pass_all_events=False,
+                 lazy=False,
                  *args, **kwargs):
         super(SigJoin, self).__init__(
             name, *args, **kwargs)
         self._inputs = []
         self._input_bitwidths = []
+        # (signal, shift, mask) of each input, in the output value.
+        self._fields = []
         self.pass_all_events = pass_all_events
-        self.add_output('output')
+        self.lazy = lazy
+        if lazy:
+            self.output = LazySignal(
+                '{}.output'.format(name), self._joined_value)
+        else:
+            self.add_output('output')
         self.reset()
 
     def add_input(self, signal, bitwidth):
@@ -81,6 +118,13 @@ class SigJoin(Device):
         self._inputs.append(signal)
         self._input_bitwidths.append(
             bitwidth)
+        # Precompute where each input goes, in the output value.
+        self._fields = []
+        shift = 0
+        for sig, width in reversed(list(zip(
+                self._inputs, self._input_bitwidths))):
+            self._fields.insert(0, (sig, shift, (1 << width) - 1))
+            shift += width
 
         def _inner(self, time, signal):
             self._input_event(
@@ -109,9 +153,40 @@ class SigJoin(Device):
     def reset(self):
         self._state = 'idle'
 
+    def _fuse(self, inline=False):
+        # Plain calls to replace the input connections (see sim.netlist).
+        # If 'inline', the output is set at once, instead of in the update
+        # region of the timestep.
+        if inline:
+            output = self.output
+            joined_value = self._joined_value
+            lazy = self.lazy
+
+            def inline_call(time, signal):
+                if lazy and not output.conns:
+                    output.invalidate()
+                else:
+                    output.set(time, joined_value())
+            return dict(('in_{}'.format(i_input + 1), inline_call)
+                        for i_input in range(len(self._inputs)))
+
+        def fused_input(i_input):
+            input_event = self._input_event
+
+            def fused_call(time, signal):
+                input_event(i_input, time, signal.state)
+            return fused_call
+        return dict(('in_{}'.format(i_input + 1), fused_input(i_input))
+                    for i_input in range(len(self._inputs)))
+
     def _input_event(
             self, i_in, time, state):
 
+        if self.lazy and not self.output.conns:
+            # Nothing subscribes to output events : just recompute the
+            # output value when it is next needed.
+            self.output.invalidate()
+            return
         if self._state == 'idle':
             self._state = 'get-updates'
             self._time = time
@@ -123,12 +198,8 @@ class SigJoin(Device):
                 # schedule an update after
                 # all 'normal' events
                 # at this timepoint.
-                self.seq.add(
-                    ((time, -9999),
-                     Action(self,
-                            '_update_output')
-                     )
-                )
+                self.seq.add_update(
+                    time, self._update_output)
         else:
             okeq(self._state, 'get-updates')
             okeq(time, self._time)
@@ -137,27 +208,24 @@ class SigJoin(Device):
     def _update_output(self, time):
         okeq(self._state, 'get-updates')
         okeq(time, self._time)
+        self.output.set(time, self._joined_value())
+        self._state = 'idle'
+
+    def _joined_value(self):
+        # The output value, from the current input states.
         val = 0
-        for sig, width in zip(
-                self._inputs,
-                self._input_bitwidths):
+        for sig, shift, mask in self._fields:
             this = sig.state
             if not isinstance(
                     this,
                     (int, float)):
-                val = SIG_UNDEF
-                break
-            else:
-                mask = (2 ** width) - 1
-                this = int(this) & mask
-                val <<= width
-                val |= this
-        self.output.set(time, val)
-        self._state = 'idle'
+                return SIG_UNDEF
+            val |= (int(this) & mask) << shift
+        return val
 
 
-def sig_join(name, sigs_and_bitwidths):
-    dev = SigJoin(name)
+def sig_join(name, sigs_and_bitwidths, sequencer=None, lazy=False):
+    dev = SigJoin(name, lazy=lazy, sequencer=sequencer)
     for sig, width in sigs_and_bitwidths:
         dev.add_input(sig, width)
     return dev
@@ -183,3 +251,15 @@ class SigSendCopy(Device):
     def send(self, time, signal):
         # Trigger an output event
         self.output.set(time, self._state)
+
+    def _fuse(self, inline=False):
+        # Plain calls to replace the input connections (see sim.netlist).
+        # N.B. a send-copy is always evaluated inline.
+        output = self.output
+
+        def fused_input(time, signal):
+            self._state = signal.state
+
+        def fused_send(time, signal):
+            output.set(time, self._state)
+        return {'input': fused_input, 'send': fused_send}
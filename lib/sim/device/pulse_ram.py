@@ -1,15 +1,45 @@
 from sim.signal import SIG_UNDEF
-from sim.device import okeq, okin
-from sim.device import Device, Action
+from sim.device import okeq, StateSet
+from sim.device import Device
+from sim.device.table import TableDevice, table_device, on_input, on_action
 
 
-class PulseRam(Device):
+# Device states, coded as bits (see sim.checks.StateSet).
+RAM_STATES = StateSet('idle', 'set-addr', 'reading', 'read-but-not-written',
+                      'writing', 'read-and-written', 'disabling-address')
+(IDLE, SET_ADDR, READING, READ_BUT_NOT_WRITTEN,
+ WRITING, READ_AND_WRITTEN, DISABLING_ADDRESS) = RAM_STATES.codes
+# States which allow an address clear.
+READ_DONE = READ_BUT_NOT_WRITTEN | READ_AND_WRITTEN
+
+
+@table_device
+class PulseRam(TableDevice):
     """
     An addressable store with read/write word contents.
     Event signal inputs for address-select (=read) and -release.
     Input captures new (write) data, allowed just once after read + before release.
 
     """
+    states = RAM_STATES
+    transitions = (
+        # Address input.
+        on_input('addr', 'idle', 'set-addr',
+                 '_t_a2r', '_a_changed', effect='_set_addr'),
+        on_action('_a_changed', 'set-addr', 'idle'),
+        # Address enable input.  Event triggered.
+        # The read-done delay just blocks a re-read, or clear too soon
+        # after read.
+        on_input('x_read', 'idle', 'reading',
+                 '_t_r2wc', '_read_done', effect='_read'),
+        on_action('_read_done', 'reading', 'read-but-not-written'),
+        on_input('d_in', 'read-but-not-written', 'writing',
+                 '_t_w2c', '_write_done', effect='_write'),
+        on_action('_write_done', 'writing', 'read-and-written'),
+        on_input('x_aclr', ('read-but-not-written', 'read-and-written'),
+                 'disabling-address', '_t_c2a', '_a_cleared'),
+        on_action('_a_cleared', 'disabling-address', 'idle'),
+    )
 
     def __init__(self,
                  name,
@@ -35,77 +65,22 @@ class PulseRam(Device):
         self.reset()
 
     def reset(self):
-        self._state = 'idle'
+        super(PulseRam, self).reset()
         self._addr = 0
 
-    @Device.input
-    def addr(self, time, signal):
-        """Address input."""
-        okeq(self._state, 'idle')
-        self._state = 'set-addr'
+    def _set_addr(self, time, signal):
         self._addr = signal.state
-        self.seq.add(
-            (time + self._t_a2r,
-             Action(self, '_a_changed')))
-
-    @Device.action
-    def _a_changed(self, time):
-        okeq(self._state, 'set-addr')
-        self._state = 'idle'
 
-    @Device.input
-    def x_read(self, time, signal):
-        """
-        Address enable input.
-        Event triggered.
-        """
-        okeq(self._state, 'idle')
-        self._state = 'reading'
+    def _read(self, time, signal):
         value = self._ram_content.get(self._addr, 0)
         self._ram_content[self._addr] = 0
-        self.seq.addall([
-            (time + self._t_r2wc,
-             Action(self, '_read_done')),
-            (time + self._t_delay,
-             Action(self, '_output_update', value))
-        ])
-
-    @Device.action
-    def _read_done(self, time):
-        # Thus just blocks a re-read
-        # or clear too soon after read.
-        okeq(self._state, 'reading')
-        self._state = 'read-but-not-written'
+        self.act(time + self._t_delay, '_output_update', value)
 
-    @Device.input
-    def d_in(self, time, signal):
-        okeq(self._state, 'read-but-not-written')
-        self._state = 'writing'
-        self.seq.add((time + self._t_w2c,
-                      Action(self, '_write_done')))
+    def _write(self, time, signal):
         value = signal.state
         okeq(isinstance(value, (int, float)), True)
         self._ram_content[self._addr] = int(value)
 
-    @Device.action
-    def _write_done(self, time):
-        okeq(self._state, 'writing')
-        self._state = 'read-and-written'
-
-    @Device.input
-    def x_aclr(self, time, signal):
-        okin(self._state, ('read-but-not-written', 'read-and-written'))
-        self._state = 'disabling-address'
-        self.seq.add(
-            (time + self._t_c2a,
-             Action(self,
-                    '_a_cleared')))
-
-    @Device.action
-    def _a_cleared(self, time):
-        okeq(self._state, 'disabling-address')
-        self._state = 'idle'
-
     @Device.action
     def _output_update(self, time, word):
         # Note: output updates after
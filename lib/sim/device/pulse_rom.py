@@ -4,11 +4,20 @@ sys.path.append(
     '/storage/emulated/0/qpython/')
 
 from sim.signal import SIG_UNDEF
-from sim.device import okeq, okin
-from sim.device import Device, Action
+from sim.device import StateSet
+from sim.device import Device
+from sim.device.table import TableDevice, table_device, on_input, on_action
 
 
-class PulseRom(Device):
+# Device states, coded as bits (see sim.checks.StateSet).
+ROM_STATES = StateSet('idle', 'set-addr', 'enabling-address', 'active',
+                      'reading', 'disabling-address')
+(IDLE, SET_ADDR, ENABLING_ADDRESS, ACTIVE,
+ READING, DISABLING_ADDRESS) = ROM_STATES.codes
+
+
+@table_device
+class PulseRom(TableDevice):
     """
     An addressable store with fixed
     read-only word contents.
@@ -17,6 +26,25 @@ class PulseRom(Device):
     trigger ("read" signal).
 
     """
+    states = ROM_STATES
+    transitions = (
+        # Address input.
+        on_input('addr', 'idle', 'set-addr',
+                 '_t_a2sel', '_a_changed', effect='_set_addr'),
+        on_action('_a_changed', 'set-addr', 'idle'),
+        # Address enable input.  Event triggered.
+        on_input('x_asel', 'idle', 'enabling-address',
+                 '_t_sel2rd', '_a_enabled'),
+        on_action('_a_enabled', 'enabling-address', 'active'),
+        # Read : a short delay before clr is valid blocks a re-read,
+        # or clear too soon after read.
+        on_input('x_read', 'active', 'reading',
+                 '_t_rd2clr', '_read_done', effect='_read'),
+        on_action('_read_done', 'reading', 'active'),
+        on_input('x_aclr', 'active', 'disabling-address',
+                 '_t_clr2ad', '_a_cleared'),
+        on_action('_a_cleared', 'disabling-address', 'idle'),
+    )
 
     def __init__(self,
                  name,
@@ -41,83 +69,24 @@ class PulseRom(Device):
         self.reset()
 
     def reset(self):
-        self._state = 'idle'
+        super(PulseRom, self).reset()
         self._addr = 0
 
-    @Device.input
-    def addr(self, time, signal):
-        """Address input."""
-        okeq(self._state, 'idle')
-        self._state = 'set-addr'
+    def _set_addr(self, time, signal):
         self._addr = signal.state
-        self.seq.add(
-            (time + self._t_a2sel,
-             Action(self, '_a_changed')))
-
-    @Device.action
-    def _a_changed(self, time):
-        okeq(self._state, 'set-addr')
-        self._state = 'idle'
-
-    @Device.input
-    def x_asel(self, time, signal):
-        """
-        Address enable input.
-        Event triggered.
-        """
-        okeq(self._state, 'idle')
-        self._state = 'enabling-address'
-        self.seq.add(
-            (time + self._t_sel2rd,
-             Action(self,
-                    '_a_enabled')))
-
-    @Device.action
-    def _a_enabled(self, time):
-        okeq(self._state, 'enabling-address')
-        self._state = 'active'
 
-    @Device.input
-    def x_read(self, time, signal):
-        okeq(self._state, 'active')
-        self._state = 'reading'
+    def _read(self, time, signal):
+        # Address must be valid when read.
+        if not isinstance(self._addr, (int, float)):
+            msg = '{} : read with an undefined address {!r}.'
+            raise ValueError(msg.format(self.name, self._addr))
         # Note: does not block until
-        # output, but do have a short
-        # delay before clr is valid.
+        # output.
         index = min(
             self._addr,
             len(self._rom) - 1)
         data = self._rom[index]
-        self.seq.addall([
-            (time + self._t_delay,
-             Action(self,
-                    '_output_update',
-                    data)),
-            (time + self._t_rd2clr,
-             Action(self,
-                    '_read_done'))
-        ])
-
-    @Device.action
-    def _read_done(self, time):
-        # Thus just blocks a re-read
-        # or clear too soon after read.
-        okeq(self._state, 'reading')
-        self._state = 'active'
-
-    @Device.input
-    def x_aclr(self, time, signal):
-        okeq(self._state, 'active')
-        self._state = 'disabling-address'
-        self.seq.add(
-            (time + self._t_clr2ad,
-             Action(self,
-                    '_a_cleared')))
-
-    @Device.action
-    def _a_cleared(self, time):
-        okeq(self._state, 'disabling-address')
-        self._state = 'idle'
+        self.act(time + self._t_delay, '_output_update', data)
 
     @Device.action
     def _output_update(self, time, word):
@@ -0,0 +1,211 @@
+"""
+Table-driven devices.
+
+Many devices follow the same pattern :  An input (or action) checks the
+device state, sets a new (maybe transitional) state, and may schedule a
+completion action after a delay, which checks and sets the state again.
+
+A TableDevice declares this as a table of transitions, from which the
+'table_device' class decorator builds the input and action methods.
+For example :
+
+    @table_device
+    class Thing(TableDevice):
+        states = StateSet('idle', 'busy')
+        transitions = (
+            on_input('go', 'idle', 'busy', delay='_t_busy', then='_done'),
+            on_action('_done', 'busy', 'idle'),
+        )
+
+Here "go" is an input, which moves 'idle' --> 'busy', and schedules the
+'_done' action after "self._t_busy".
+A transition may also name an 'effect' method, for any other work, which is
+called with the same arguments, after the state change and scheduling.
+
+The table is checked when the class is built, and the timings (plus any
+'timing_rules') when a device is reset.
+
+"""
+from collections import namedtuple
+from numbers import Number
+
+import six
+
+from sim.checks import okstate
+from sim.device import Device
+
+
+Transition = namedtuple(
+    'Transition',
+    'kind name from_states to_state delay then effect')
+
+
+def on_input(name, from_states, to_state,
+             delay=None, then=None, effect=None):
+    """
+    A table transition made by an input.
+
+    Args:
+
+    * name (string):
+        name of the input method.
+    * from_states (string or iterable of string):
+        state(s) in which the input is allowed.
+    * to_state (string):
+        state which the input sets.
+    * delay (string):
+        name of the device attribute with the delay before 'then'.
+    * then (string):
+        name of the action to schedule after the delay.
+    * effect (string):
+        name of a method to call, as "effect(time, signal)".
+
+    """
+    return _transition('input', name, from_states, to_state,
+                       delay, then, effect)
+
+
+def on_action(name, from_states, to_state,
+              delay=None, then=None, effect=None):
+    """
+    A table transition made by a (scheduled) action.
+
+    Arguments as for 'on_input', except that an effect is called as
+    "effect(time, *args)".
+
+    """
+    return _transition('action', name, from_states, to_state,
+                       delay, then, effect)
+
+
+def _transition(kind, name, from_states, to_state, delay, then, effect):
+    if isinstance(from_states, six.string_types):
+        from_states = (from_states,)
+    return Transition(kind, name, tuple(from_states), to_state,
+                      delay, then, effect)
+
+
+class TableDevice(Device):
+    """
+    A device whose states and transitions are declared in a table.
+
+    Subclasses define 'states' (a StateSet, whose first state is the initial
+    one) and 'transitions' (made with 'on_input' and 'on_action'), and must
+    be built with the 'table_device' decorator.
+
+    They may also define 'timing_rules', as pairs of delay attribute names
+    (longer, shorter), where delay "longer" must be >= delay "shorter".
+
+    """
+    states = None
+    transitions = ()
+    timing_rules = ()
+
+    @property
+    def state_name(self):
+        """The readable name of the current state."""
+        return self.states.name(self._state)
+
+    def reset(self):
+        self.check_timings()
+        self._state = self.states.codes[0]
+
+    def check_timings(self):
+        """Check all the table delays, and the timing rules."""
+        for delay_name in sorted(set(transition.delay
+                                     for transition in self.transitions
+                                     if transition.delay is not None)):
+            delay = getattr(self, delay_name)
+            if not isinstance(delay, Number) or delay < 0:
+                msg = '{} : timing {}={!r} is not a valid delay.'
+                raise ValueError(msg.format(self.name, delay_name, delay))
+        for longer, shorter in self.timing_rules:
+            if getattr(self, longer) < getattr(self, shorter):
+                msg = ('{} : {}({}) < {}({}) : disallowed by the '
+                       'timing rules.')
+                raise ValueError(msg.format(
+                    self.name, longer, getattr(self, longer),
+                    shorter, getattr(self, shorter)))
+
+
+def _input_method(allowed, to_state, delay, then, effect, states):
+    # Build an input method for a transition.
+    def input_method(self, time, signal):
+        okstate(self._state, allowed, states)
+        self._state = to_state
+        if then is not None:
+            self.seq.add_call(time + getattr(self, delay),
+                              getattr(self, then))
+        if effect is not None:
+            getattr(self, effect)(time, signal)
+    input_method._device_call_type = 'input'
+    return input_method
+
+
+def _action_method(allowed, to_state, delay, then, effect, states):
+    # Build an action method for a transition.
+    def action_method(self, time, *args):
+        okstate(self._state, allowed, states)
+        self._state = to_state
+        if then is not None:
+            self.seq.add_call(time + getattr(self, delay),
+                              getattr(self, then))
+        if effect is not None:
+            getattr(self, effect)(time, *args)
+    action_method._device_call_type = 'action'
+    return action_method
+
+
+def table_device(cls):
+    """
+    Class decorator for a TableDevice :  Checks the table, and builds the
+    input and action methods from it.
+
+    """
+    states = cls.states
+    msg_start = 'Bad state table for {} : '.format(cls.__name__)
+    names = set()
+    reachable = set(states.names[:1])
+    for transition in cls.transitions:
+        name = transition.name
+        if name in names:
+            msg = 'transition "{}" is defined twice.'
+            raise ValueError(msg_start + msg.format(name))
+        names.add(name)
+        for state in transition.from_states + (transition.to_state,):
+            if state not in states.names:
+                msg = 'transition "{}" has an unknown state {!r}.'
+                raise ValueError(msg_start + msg.format(name, state))
+        if (transition.then is None) != (transition.delay is None):
+            msg = 'transition "{}" needs both "delay" and "then", or neither.'
+            raise ValueError(msg_start + msg.format(name))
+        reachable.add(transition.to_state)
+    for transition in cls.transitions:
+        then = transition.then
+        if then is not None and then not in names and \
+                not hasattr(cls, then):
+            msg = 'transition "{}" schedules an unknown action "{}".'
+            raise ValueError(msg_start + msg.format(transition.name, then))
+    unreachable = [state for state in states.names if state not in reachable]
+    if unreachable:
+        msg = 'states {} are never reached.'
+        raise ValueError(msg_start + msg.format(unreachable))
+
+    for transition in cls.transitions:
+        make_method = {'input': _input_method,
+                       'action': _action_method}[transition.kind]
+        method = make_method(states.mask(*transition.from_states),
+                             states.code(transition.to_state),
+                             transition.delay, transition.then,
+                             transition.effect, states)
+        method.__name__ = transition.name
+        msg = '{} {} : {} --> {!r}'.format(
+            transition.kind.capitalize(), transition.name,
+            ' | '.join(repr(state) for state in transition.from_states),
+            transition.to_state)
+        if transition.then is not None:
+            msg += ', then "{}" after {}'.format(transition.then,
+                                                 transition.delay)
+        method.__doc__ = msg + '.'
+        setattr(cls, transition.name, method)
+    return cls
@@ -0,0 +1,343 @@
+"""
+Monte-Carlo timing-tolerance analysis of Counters.
+
+Real ball-bearing parts have some spread in their timings.  This evaluates
+an ensemble of Counter samples, each with its own (random) one-bit toggle
+and carry timings, against the same input stream, and reports how long
+each input takes to settle, and which samples hit a state violation.
+
+All the samples are evaluated together, as numpy arrays :  The bits are
+worked one at a time (as each bit depends only on the inputs and the carries
+from the bit below), with the same one-bit logic as a Counter, or a
+BehaviouralCounter (see sim.device.arith).
+
+numpy is needed for this, but is not needed by the rest of sim.
+
+"""
+from __future__ import print_function
+
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from sim.device.arith import (
+    _ONEBIT_TIMINGS, ONEBIT_STATES, ONEBIT_IDLE_ANY, ONEBIT_CONTROL_OK,
+    IDLE, IDLE_WITH_CLEARING, VALUE_TOGGLING, CARRY_PROPAGATING, DROPPING,
+    CONTROLS_CHANGING)
+
+
+# The one-bit timings which are randomly perturbed.
+PERTURBED_TIMINGS = ('t_toggle_0_to_1', 't_toggle_1_to_0', 't_out_2_carry')
+
+# Results of an ensemble evaluation.
+#  timings : the one-bit timings, as arrays of (n_samples, n_bits)
+#  settle_times : the delay from each input to the last bit output change it
+#      caused, as (n_samples, n_inputs) :  NaN if no change, or if at or
+#      after a violation
+#  violation_times : time of the first state violation of each sample, or NaN
+#  violations : the one-bit state code at the first violation, or 0
+#  values : the final counter value of each sample
+EnsembleResult = namedtuple(
+    'EnsembleResult',
+    ('timings', 'settle_times', 'violation_times', 'violations', 'values'))
+
+# Summary of an EnsembleResult.
+#  n_samples : the number of samples
+#  failed : the fraction with any state violation
+#  controls_changing : the fraction with a 'controls-changing' violation
+#  settle_percentiles : {percentile: settle time}, over all the inputs
+#      of all samples without a violation
+EnsembleSummary = namedtuple(
+    'EnsembleSummary',
+    ('n_samples', 'failed', 'controls_changing', 'settle_percentiles'))
+
+
+def _check_numpy():
+    if np is None:
+        raise ImportError('Counter ensemble evaluation requires numpy.')
+
+
+def perturbed_timings(n_samples, n_bits, spread=0.1, onebit_kwargs=None,
+                      seed=None):
+    """
+    Make random one-bit timings, for an ensemble of counters.
+
+    Args:
+
+    * n_samples, n_bits (int):
+        the ensemble size, and counter width.
+    * spread (float):
+        the relative standard deviation of the perturbed timings.
+    * onebit_kwargs (dict):
+        nominal one-bit timings, as for a Counter (default as CounterOnebit).
+    * seed (int):
+        random seed.
+
+    Returns:
+        a dictionary of all the one-bit timings :  The PERTURBED_TIMINGS are
+        arrays of (n_samples, n_bits), normally distributed about the
+        nominal values (but not negative), and the others are single values.
+
+    """
+    _check_numpy()
+    timings = _ONEBIT_TIMINGS.copy()
+    timings.update(onebit_kwargs or {})
+    random_state = np.random.RandomState(seed)
+    for name in PERTURBED_TIMINGS:
+        nominal = timings[name]
+        values = random_state.normal(nominal, spread * nominal,
+                                     (n_samples, n_bits))
+        timings[name] = np.maximum(values, 0.0)
+    return timings
+
+
+def _in_progress(time, scheduled, end_time, end_scheduled):
+    # Array form of sim.device.arith._in_progress.
+    return (time < end_time) | ((time == end_time) &
+                                (scheduled <= end_scheduled))
+
+
+def evaluate_ensemble(stimuli, n_bits, timings):
+    """
+    Evaluate an ensemble of counters, all with the same inputs.
+
+    Args:
+
+    * stimuli (list):
+        the counter inputs, as (time, input_name, value), where input_name
+        is 'input' or 'clear', in time order.
+    * n_bits (int):
+        the counter width.
+    * timings (dict):
+        one-bit timings, as from 'perturbed_timings' :  Each is a single
+        value, or an array of (n_samples, n_bits).
+
+    Returns:
+        an EnsembleResult.
+
+    """
+    _check_numpy()
+    shapes = set(np.shape(value) for value in timings.values()
+                 if np.ndim(value) == 2)
+    if len(shapes) != 1:
+        msg = 'Expected timing arrays of a single shape, got {}.'
+        raise ValueError(msg.format(sorted(shapes)))
+    n_samples, timing_bits = shapes.pop()
+    if timing_bits != n_bits:
+        msg = 'Timings are for {} bits, not {}.'
+        raise ValueError(msg.format(timing_bits, n_bits))
+
+    def bit_timing(name, i_bit):
+        value = timings[name]
+        if np.ndim(value) == 2:
+            return value[:, i_bit]
+        return np.full(n_samples, float(value))
+
+    n_inputs = len(stimuli)
+    input_times = np.array([time for time, _, _ in stimuli], dtype=float)
+    # The carry gates are closed while clearing.
+    gate_times = [time for time, name, _ in stimuli if name == 'clear']
+    gate_values = np.array([not value for _, name, value in stimuli
+                            if name == 'clear'], dtype=bool)
+    rows = np.arange(n_samples)
+    # Latest bit output change caused by each input.
+    set_times = np.full((n_samples, n_inputs), -np.inf)
+    violation_times = np.full(n_samples, np.inf)
+    violations = np.zeros(n_samples, dtype=int)
+    values = np.zeros(n_samples, dtype=int)
+
+    # Carries into the current bit, as arrays of (n_samples, n_carries) :
+    # time (inf for none), scheduled time, and the input which caused it.
+    carry_times = np.zeros((n_samples, 0))
+    carry_scheduled = np.zeros((n_samples, 0))
+    carry_origins = np.zeros((n_samples, 0), dtype=int)
+    for i_bit in range(n_bits):
+        bit = 1 << i_bit
+        t_0_1 = bit_timing('t_toggle_0_to_1', i_bit)
+        t_1_0 = bit_timing('t_toggle_1_to_0', i_bit)
+        t_carry = bit_timing('t_out_2_carry', i_bit)
+        t_drop = bit_timing('t_clear_2_carry', i_bit)
+        t_clear = bit_timing('t_clear_onoff', i_bit)
+
+        # All arrivals, as arrays of (n_samples, n_arrivals), in time order
+        # (with inputs, which are scheduled in advance, first).
+        # Kinds are 0 for an input or carry, 1 for clear off, 2 for clear on.
+        i_stimuli = [i_input for i_input, (_, name, value)
+                     in enumerate(stimuli)
+                     if name == 'clear' or value & bit]
+        stimulus_kinds = [(1 + bool(stimuli[i_input][2]))
+                          if stimuli[i_input][1] == 'clear' else 0
+                          for i_input in i_stimuli]
+
+        def arrivals(stimulus_values, carry_values):
+            # The stimulus values (the same for all samples), then carries.
+            stimulus_values = np.tile(
+                np.array(stimulus_values, dtype=carry_values.dtype),
+                (n_samples, 1)).reshape(n_samples, len(i_stimuli))
+            return np.concatenate([stimulus_values, carry_values], axis=1)
+
+        times = arrivals(input_times[i_stimuli], carry_times)
+        scheduled = arrivals([-np.inf] * len(i_stimuli), carry_scheduled)
+        kinds = arrivals(stimulus_kinds,
+                         np.zeros(carry_times.shape, dtype=int))
+        origins = arrivals(i_stimuli, carry_origins)
+        order = np.lexsort((scheduled, times), axis=-1)
+        times, scheduled, kinds, origins = [
+            np.take_along_axis(array, order, axis=1)
+            for array in (times, scheduled, kinds, origins)]
+
+        # The one-bit state of each sample.
+        value = np.zeros(n_samples, dtype=bool)
+        clearing = np.zeros(n_samples, dtype=bool)
+        dropping = np.zeros(n_samples, dtype=bool)
+        busy_end = [np.full(n_samples, -np.inf), np.full(n_samples, -np.inf)]
+        toggle_end = [np.full(n_samples, -np.inf),
+                      np.full(n_samples, -np.inf)]
+        control_end = [np.full(n_samples, -np.inf),
+                       np.full(n_samples, -np.inf)]
+        carries_out = []
+        for i_arrival in range(times.shape[1]):
+            time = times[:, i_arrival]
+            sched = scheduled[:, i_arrival]
+            kind = kinds[:, i_arrival]
+            origin = origins[:, i_arrival]
+            arrived = np.isfinite(time)
+            in_control_change = _in_progress(time, sched, *control_end)
+            in_busy = _in_progress(time, sched, *busy_end)
+            in_toggle = _in_progress(time, sched, *toggle_end)
+            state = np.where(
+                in_control_change, CONTROLS_CHANGING,
+                np.where(in_busy,
+                         np.where(dropping, DROPPING,
+                                  np.where(in_toggle, VALUE_TOGGLING,
+                                           CARRY_PROPAGATING)),
+                         np.where(clearing, IDLE_WITH_CLEARING, IDLE)))
+            is_input = arrived & (kind == 0)
+            clear_value = kind == 2
+            is_clear = arrived & (kind != 0) & (clear_value != clearing)
+            # Note : a second clear change, within the change period, is
+            # a violation even though the state is 'controls-changing'.
+            bad = ((is_input & (state & ONEBIT_IDLE_ANY == 0)) |
+                   (is_clear & ((state & ONEBIT_CONTROL_OK == 0) |
+                                in_control_change)))
+            first = bad & (time < violation_times)
+            violation_times[first] = time[first]
+            violations[first] = state[first]
+
+            # Inputs.
+            drop = is_input & clearing
+            toggle = is_input & ~clearing
+            drop_time = time + t_0_1 + t_drop
+            toggle_time = time + np.where(value, t_1_0, t_0_1)
+            dropping = np.where(is_input, drop, dropping)
+            value = np.where(toggle, ~value, value)
+            carry = toggle & ~value
+            toggle_end = [np.where(toggle, toggle_time, toggle_end[0]),
+                          np.where(toggle, time, toggle_end[1])]
+            busy_end = [
+                np.where(drop, drop_time,
+                         np.where(carry, toggle_time + t_carry,
+                                  np.where(toggle, toggle_time,
+                                           busy_end[0]))),
+                np.where(drop, time,
+                         np.where(carry, toggle_time,
+                                  np.where(toggle, time, busy_end[1])))]
+
+            # Clear changes.
+            drop_stored = is_clear & clear_value & value
+            control_end = [np.where(is_clear, time + t_clear, control_end[0]),
+                           np.where(is_clear, time, control_end[1])]
+            clearing = np.where(is_clear, clear_value, clearing)
+            value = np.where(drop_stored, False, value)
+
+            # Carries out :  Dropped inputs and values also send a carry,
+            # though the carry gate is then closed.
+            carries_out.append((
+                np.where(carry, toggle_time + t_carry,
+                         np.where(drop, drop_time,
+                                  np.where(drop_stored, time + t_drop,
+                                           np.inf))),
+                np.where(carry, toggle_time, time),
+                origin))
+
+            # Bit output changes.
+            changed_time = np.where(
+                toggle, toggle_time,
+                np.where(drop, drop_time,
+                         np.where(drop_stored, time + t_drop, -np.inf)))
+            changed = toggle | drop | drop_stored
+            np.maximum.at(set_times, (rows[changed], origin[changed]),
+                          changed_time[changed])
+        values |= np.where(value, bit, 0)
+
+        # Carries pass on to the next bit only while the gate is open.
+        if carries_out:
+            carry_times, carry_scheduled, carry_origins = [
+                np.stack(arrays, axis=1) for arrays in zip(*carries_out)]
+        else:
+            carry_times = np.zeros((n_samples, 0))
+            carry_scheduled = np.zeros((n_samples, 0))
+            carry_origins = np.zeros((n_samples, 0), dtype=int)
+        i_gate = np.searchsorted(gate_times, carry_times, side='right')
+        gate_open = np.concatenate([[True], gate_values])[i_gate]
+        carry_times = np.where(gate_open, carry_times, np.inf)
+        # Drop carries which never happen (in any sample).
+        keep = np.isfinite(carry_times).any(axis=0)
+        carry_times = carry_times[:, keep]
+        carry_scheduled = carry_scheduled[:, keep]
+        carry_origins = carry_origins[:, keep]
+
+    settle_times = set_times - input_times
+    settle_times[~np.isfinite(settle_times)] = np.nan
+    settle_times[input_times >= violation_times[:, None]] = np.nan
+    violation_times[~np.isfinite(violation_times)] = np.nan
+    return EnsembleResult(timings, settle_times, violation_times,
+                          violations, values)
+
+
+def summarise(result, percentiles=(5, 50, 95, 100)):
+    """Make an EnsembleSummary of an EnsembleResult."""
+    _check_numpy()
+    failed = result.violations != 0
+    settle_times = result.settle_times[~failed]
+    settle_times = settle_times[np.isfinite(settle_times)]
+    if settle_times.size:
+        settle_percentiles = dict(
+            (percentile, float(np.percentile(settle_times, percentile)))
+            for percentile in percentiles)
+    else:
+        settle_percentiles = dict((percentile, None)
+                                  for percentile in percentiles)
+    n_samples = len(result.violations)
+    return EnsembleSummary(
+        n_samples,
+        float(np.mean(failed)),
+        float(np.mean(result.violations == CONTROLS_CHANGING)),
+        settle_percentiles)
+
+
+def format_summary(summary):
+    """Make a printable report of an EnsembleSummary."""
+    lines = ['samples : {}'.format(summary.n_samples),
+             'failed : {:.1%}'.format(summary.failed),
+             '{} : {:.1%}'.format(ONEBIT_STATES.name(CONTROLS_CHANGING),
+                                  summary.controls_changing),
+             'settle times :']
+    for percentile, time in sorted(summary.settle_percentiles.items()):
+        time = '-' if time is None else '{:.2f}'.format(time)
+        lines.append('  {:>3d}% : {}'.format(percentile, time))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    # A 6-bit counter, counting in 1s and 3s, with a clear between.
+    stimuli = [(20.0 * i_input, 'input', 1 + 2 * (i_input % 2))
+               for i_input in range(64)]
+    stimuli += [(1300.0, 'clear', 1), (1320.0, 'clear', 0)]
+    stimuli += [(1340.0 + 9.0 * i_input, 'input', 1)
+                for i_input in range(64)]
+    timings = perturbed_timings(10000, 6, spread=0.15, seed=1)
+    print(format_summary(summarise(evaluate_ensemble(stimuli, 6, timings))))
@@ -1,17 +1,32 @@
 from sim.signal import Signal, SIG_UNDEF
 from sim.sequencer import DEFAULT_SEQUENCER as SEQ
-from sim.device import Device, Action, ClockTick
+from sim.device import Device, ClockTick
 
 
 class Wire(Device):
+    """
+    A delay line : the output follows the input, 'delay' later.
+
+    By default, all input changes reach the output ("transport" delay).
+    If 'inertial' is set, a new input change cancels any change still on its
+    way to the output, so that pulses shorter than the delay are swallowed.
+
+    """
     def __init__(self,
                  name, delay=1, startval=None,
+                 inertial=False,
                  *args, **kwargs):
         super(Wire, self).__init__(
             name, *args, **kwargs)
         self.delay = delay
+        self.inertial = inertial
         self.add_output(
             'output', startval)
+        self.reset()
+
+    def reset(self):
+        # The scheduled output change, if any (only used when inertial).
+        self._pending = None
 
     @Device.input
     def input(self, time, signal):
@@ -19,15 +34,20 @@ class Wire(Device):
         if state != signal.previous:
             # output ok till change?
             # self.output.set(SIG_UNDEF)
-            self.seq.add((
-                time + self.delay,
-                Action(self,
-                       '_set_delay',
-                       signal.state)))
+            if not self.inertial:
+                self.act(time + self.delay, '_set_delay', state)
+                return
+            if self._pending is not None:
+                self.cancel(self._pending)
+                self._pending = None
+            if state != self.output.state:
+                self._pending = self.act(
+                    time + self.delay, '_set_delay', state)
 
     @Device.action
     def _set_delay(self, time, state):
         # msg = '!set_delay({}, {})'
         # print msg. format (
         #    time, state)
+        self._pending = None
         self.output.set(time, state)
@@ -0,0 +1,93 @@
+"""
+Netlist flattening :  fusing pseudo-devices into signal connections.
+
+The pseudo-devices (SigBitslice, SigJoin and SigSendCopy) are full devices,
+so each of their input events is a call through a device input method.
+Once a network is built, 'fuse' replaces those input connections with plain
+calls, which do the same work directly.  Adjacent bit-slices of the same
+signal are also merged into a single connection.
+
+All signals are still set exactly as before, so the observable signal values
+(and any signal tracing) are unchanged.  But the inputs of a fused device can
+no longer be hooked or traced.
+
+Optionally, fused SigJoins can also be evaluated inline ('inline_joins') :
+Each input change then sets the output at once, instead of scheduling an
+update for the end of the timestep, so there are no join update events.
+This is not exactly equivalent :  The output comes before any other events
+at the same time, and if several inputs change at the same time, the output
+shows each intermediate value.  So it only suits networks where each join
+has at most one input change per timestep, and nothing depends on the order
+of events within a timestep.
+
+"""
+from sim.checkpoint import connected_objects
+from sim.device.pseudo_devices import _fused_bitslices
+from sim.simulation import Simulation
+
+
+def fuse(objects, inline_joins=False):
+    """
+    Fuse pseudo-devices into their input signal connections.
+
+    Args:
+
+    * objects (Simulation, or list of Device or Signal):
+        a whole simulation, or some devices and signals :  Everything
+        connected 'downstream' of these is included (see
+        'sim.checkpoint.connected_objects').
+    * inline_joins (bool):
+        if set, fused SigJoins set their outputs at once, instead of in the
+        update region (see above).
+
+    Returns:
+        a list of the devices fused.
+
+    Devices with hooks or traces on their inputs are left as they are.
+
+    """
+    if isinstance(objects, Simulation):
+        devices = list(objects.devices.values())
+    else:
+        devices, _ = connected_objects(objects)
+    fused_devices = []
+    changed_signals = []
+    for device in devices:
+        if device._fused or not hasattr(device, '_fuse'):
+            continue
+        input_names = set(name for name, _ in device._connections)
+        if any(device._hooks.get(name) or name in device._traces
+               for name in input_names):
+            continue
+        fused_inputs = device._fuse(inline=inline_joins)
+        for input_name, signal in device._connections:
+            method = getattr(device, input_name)
+            fused_input = fused_inputs[input_name]
+            fused_input._fused_devices = [device]
+            signal.replace_connection(method, fused_input)
+            changed_signals.append(signal)
+        device._fused = True
+        fused_devices.append(device)
+    for signal in changed_signals:
+        _merge_bitslices(signal)
+    return fused_devices
+
+
+def _merge_bitslices(signal):
+    # Merge each run of adjacent (fused) bitslice connections into one.
+    conns = []
+    for conn in signal.conns:
+        previous = conns[-1] if conns else None
+        if hasattr(conn, '_bitslices') and hasattr(previous, '_bitslices'):
+            merged = _fused_bitslices(previous._bitslices + conn._bitslices)
+            merged._fused_devices = (previous._fused_devices +
+                                     conn._fused_devices)
+            conns[-1] = merged
+        else:
+            conns.append(conn)
+    signal.conns[:] = conns
+
+
+def fused_devices(conn):
+    """Return the devices fused into a signal connection (if any)."""
+    return list(getattr(conn, '_fused_devices', []))
@@ -1,7 +1,22 @@
+from bisect import insort
+from contextlib import contextmanager
+import gc
+from heapq import heapify, heappush, heappop, nsmallest
+from itertools import count
+
+
 class Event(object):
-    def __init__(self, evdata):
+    """
+    A scheduled call, made as "call(time, *args)".
+
+    Compact (slots-based), as sequencers handle very large numbers of them.
+
+    """
+    __slots__ = ('time', 'priority', 'call', 'args', 'seq', 'pending')
+
+    def __init__(self, evdata, args=()):
         time, call = evdata
-        if hasattr(time, '__getitem__'):
+        if isinstance(time, (tuple, list)):
             # ev=((time, priority), call)
             time, priority = time
         else:
@@ -10,62 +25,581 @@ class Event(object):
         self.time = time
         self.priority = priority
         self.call = call
+        self.args = args
+        # Sequence number : set when added to a sequencer.
+        self.seq = 0
+        # Set while queued in a sequencer : cleared when run or cancelled.
+        self.pending = False
+
+    def __reduce__(self):
+        return (_rebuild_event,
+                (self.time, self.priority, self.call, self.args,
+                 self.seq, self.pending))
 
     def key(self):
         # priority separates events
         # at same time, for which
         # higher numbers come first.
+        # Events with the same time and
+        # priority run in the order they
+        # were added (by sequence number).
+        # N.B. sequencer queue entries are
+        # this, plus the event itself.
         return (self.time,
-                -self.priority)
+                -self.priority,
+                self.seq)
 
     def __repr__(self):
+        call = self.call
+        device = getattr(call, '__self__', None)
+        if hasattr(device, 'name') and hasattr(call, '__name__'):
+            # A device method : show it like an Action.
+            args = '...'
+            if self.args:
+                args = '.. ' + ','.join(str(x) for x in self.args)
+            call = 'Action<{}.{}({})>'.format(
+                device.name, call.__name__, args)
         msg = 'Event<@({},{}): {}>'
         msg = msg.format(
             self.time, self.priority,
-            self.call)
+            call)
         return msg
 
 
+def _rebuild_event(time, priority, call, args, seq, pending):
+    event = Event(((time, priority), call), args)
+    event.seq = seq
+    event.pending = pending
+    return event
+
+
 def _make_event(evdata):
     if not isinstance(evdata, Event):
         evdata = Event(evdata)
     return evdata
 
 
-class Sequencer(object):
+# Priority of events which run after all others at the same time.
+UPDATE_PRIORITY = float('-inf')
+
+# Smallest number of events that 'addall' inserts in bulk :  Fewer (e.g. the
+# few new events returned by each event call) are just added one at a time.
+BULK_ADD_SIZE = 64
+
+
+@contextmanager
+def _gc_paused():
+    # Pause the cyclic garbage collector.  A bulk add makes many new,
+    # long-lived objects, which would otherwise trigger repeated collections
+    # of everything already queued.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class _SequencerBase(object):
+    """
+    Common event cancelling and update regions, for all sequencer types.
+
+    'add' returns the queued Event, which can be passed to 'cancel'.
+    A cancelled event stays in the queue, but is skipped when it comes up.
+    When the cancelled events exceed 'compact_fraction' of the queue, they are
+    all removed.
+
+    Each timestep also has an "update region" (as in VHDL/Verilog delta
+    cycles) :  Calls added with 'add_update' run, in the order added, once all
+    the queued events at that time are done.  Any new events which they add
+    at the same time then run, followed by any new updates, and so on, until
+    the timestep is complete.  The updates of the current timestep are kept
+    in a simple list, not the event queue.
+
+    """
+    compact_fraction = 0.5
+
+    def add_call(self, time, call, args=(), priority=0):
+        """
+        Schedule "call(time, *args)".
+
+        Cheaper than adding an event with an Action.
+        Returns the Event.
+
+        """
+        event = Event((time, call), args)
+        if priority:
+            event.priority = priority
+        return self.add(event)
+
+    def _new_entries(self, events):
+        # Number and queue a list of new events, for a bulk add.
+        # Returns the Events, and their queue entries (in the same order).
+        events = [_make_event(event) for event in events]
+        seq_0 = next(self._seq_numbers)
+        self._seq_numbers = count(seq_0 + len(events))
+        entries = []
+        append = entries.append
+        for seq, event in enumerate(events, seq_0):
+            event.seq = seq
+            event.pending = True
+            append((event.time, -event.priority, seq, event))
+        return events, entries
+
+    def add_update(self, time, call, args=()):
+        """
+        Schedule "call(time, *args)" in the update region of a timestep, i.e.
+        after all the other events at that time.
+
+        For the current timestep, this just adds to a list, and returns None.
+        Otherwise (i.e. for a future time), it adds an Event with the lowest
+        possible priority, and returns that.
+
+        """
+        updates = self._updates
+        if time == self.time or (updates and time == self._update_time):
+            if not updates:
+                self._update_time = time
+            updates.append((call, args))
+            return None
+        return self.add_call(time, call, args, priority=UPDATE_PRIORITY)
+
+    def _run_updates(self):
+        # Run the pending updates (one delta cycle).
+        # N.B. any new updates are for the next delta cycle.
+        updates = self._updates
+        time = self._update_time
+        self.time = time
+        batch = list(updates)
+        del updates[:]
+        for call, args in batch:
+            call(time, *args)
+
+    def clear(self):
+        self._n_cancelled = 0
+        # Time of the latest event run.
+        self.time = None
+        # Pending update-region calls, for the timestep '_update_time'.
+        # N.B. clear in-place, as 'run' keeps a reference.
+        if not hasattr(self, '_updates'):
+            self._updates = []
+        else:
+            # Any queued events are discarded, so are no longer pending.
+            for event in self._queued_events():
+                event.pending = False
+        del self._updates[:]
+        self._update_time = None
+
+    def cancel(self, event):
+        """
+        Withdraw a pending event.
+
+        Returns True if cancelled, or False if it was not pending.
+
+        """
+        if not event.pending:
+            return False
+        event.pending = False
+        self._n_cancelled += 1
+        if self._n_cancelled > self.compact_fraction * self._n_queued():
+            self._compact()
+            self._n_cancelled = 0
+        return True
+
+    def save_state(self):
+        """Return a snapshot of the queue, which 'restore_state' reinstates."""
+        events = self._queued_events()
+        return (self._get_queue(),
+                events,
+                [event.pending for event in events],
+                next(self._seq_numbers),
+                self._n_cancelled,
+                self.time,
+                list(self._updates),
+                self._update_time)
+
+    def restore_state(self, state):
+        """Reinstate the queue from a 'save_state' snapshot."""
+        (queue, events, pendings, next_seq, n_cancelled, time,
+         updates, update_time) = state
+        self._set_queue(queue)
+        for event, pending in zip(events, pendings):
+            event.pending = pending
+        self._seq_numbers = count(next_seq)
+        self._n_cancelled = n_cancelled
+        self.time = time
+        self._updates[:] = updates
+        self._update_time = update_time
+
+
+class ListSequencer(_SequencerBase):
+    """
+    The original, simple sequencer : keeps a fully sorted list of events.
+
+    Every 'add' re-sorts the whole list, so it is only suitable for small
+    numbers of pending events.  Kept for reference (and benchmarks).
+
+    """
     def __init__(self):
         self.clear()
 
     def clear(self):
+        super(ListSequencer, self).clear()
         self.events = []
+        self._seq_numbers = count(1)
+
+    def _n_queued(self):
+        return len(self.events)
+
+    def _compact(self):
+        self.events = [ev for ev in self.events if ev.pending]
+
+    def _queued_events(self):
+        return self.events
+
+    def _get_queue(self):
+        return list(self.events)
+
+    def _set_queue(self, queue):
+        self.events = list(queue)
 
     def add(self, event):
         # print 'add:{}'.format(event)
         event = _make_event(event)
+        event.seq = next(self._seq_numbers)
+        event.pending = True
         events = self.events + [event]
         events = sorted(events,
                         key=lambda ev: ev.key())
         self.events = events
+        return event
 
     def addall(self, events):
         # print 'addall:{}'.format(events)
         if events:
             if not isinstance(events, list):
                 events = [events]
+            events = [_make_event(ev) for ev in events]
             for ev in events:
-                self.add(ev)
+                ev.seq = next(self._seq_numbers)
+                ev.pending = True
+            # Sort the new events, and merge with the existing ones.
+            # N.B. the sort finds + merges the two sorted runs, in one pass.
+            new_events = sorted(events, key=lambda ev: ev.key())
+            self.events = sorted(self.events + new_events,
+                                 key=lambda ev: ev.key())
+            return events
 
     def run(self, stop=None):
-        while len(self.events) > 0:
+        updates = self._updates
+        while self.events or updates:
+            if updates and (not self.events or
+                            self.events[0].time > self._update_time):
+                # End of a timestep : run its updates.
+                self._run_updates()
+                continue
             event = self.events[0]
             time = event.time
             if (stop is not None and
                     time > stop):
                 break
             self.events = self.events[1:]
-            new_evs = event.call(time)
+            if not event.pending:
+                # Cancelled.
+                self._n_cancelled -= 1
+                continue
+            event.pending = False
+            self.time = time
+            new_evs = event.call(time, *event.args)
             self.addall(new_evs)
 
 
+class HeapSequencer(_SequencerBase):
+    """
+    A sequencer with a binary-heap event queue.
+
+    Same ordering as the ListSequencer, i.e. by Event.key().  But 'add' and
+    each step of 'run' are O(log n) in the number of pending events.
+
+    """
+    def __init__(self):
+        self._heap = []
+        self.clear()
+
+    def clear(self):
+        super(HeapSequencer, self).clear()
+        # N.B. clear in-place, in case we are called from within 'run'.
+        del self._heap[:]
+        self._seq_numbers = count(1)
+
+    @property
+    def events(self):
+        """The pending events, in order (a sorted copy of the queue)."""
+        return [entry[-1] for entry in sorted(self._heap)
+                if entry[-1].pending]
+
+    def _n_queued(self):
+        return len(self._heap)
+
+    def _compact(self):
+        heap = self._heap
+        heap[:] = [entry for entry in heap if entry[-1].pending]
+        heapify(heap)
+
+    def _queued_events(self):
+        return [entry[-1] for entry in self._heap]
+
+    def _get_queue(self):
+        return list(self._heap)
+
+    def _set_queue(self, queue):
+        self._heap[:] = queue
+
+    def add(self, event):
+        event = _make_event(event)
+        event.seq = next(self._seq_numbers)
+        event.pending = True
+        heappush(self._heap,
+                 (event.time, -event.priority, event.seq, event))
+        return event
+
+    def addall(self, events):
+        if events:
+            if not isinstance(events, list):
+                return [self.add(events)]
+            if len(events) < BULK_ADD_SIZE:
+                return [self.add(event) for event in events]
+            with _gc_paused():
+                events, entries = self._new_entries(events)
+                heap = self._heap
+                if 8 * len(entries) > len(heap):
+                    # Cheaper to rebuild the heap, in one pass.
+                    heap.extend(entries)
+                    heapify(heap)
+                else:
+                    for entry in entries:
+                        heappush(heap, entry)
+            return events
+
+    def run(self, stop=None):
+        heap = self._heap
+        updates = self._updates
+        while heap or updates:
+            if updates and (not heap or heap[0][0] > self._update_time):
+                # End of a timestep : run its updates.
+                self._run_updates()
+                continue
+            time = heap[0][0]
+            if (stop is not None and
+                    time > stop):
+                break
+            event = heappop(heap)[-1]
+            if not event.pending:
+                # Cancelled.
+                self._n_cancelled -= 1
+                continue
+            event.pending = False
+            self.time = time
+            new_evs = event.call(time, *event.args)
+            self.addall(new_evs)
+
+
+class CalendarSequencer(_SequencerBase):
+    """
+    A sequencer with a "calendar queue" of events.
+
+    Events are spread over a ring of time buckets ("days"), each of
+    'bucket_width' duration :  Each bucket holds a short, sorted list of events
+    for its days, in all "years".  This gives ~O(1) add and pop, when the
+    buckets are a good match to the spread of pending event times, as in
+    simulations where most events are scheduled a short delay ahead.
+
+    The number of buckets follows the number of pending events.  If no
+    'bucket_width' is given, it is re-estimated from the gaps between the
+    earliest pending events whenever the number of buckets changes.
+
+    Event ordering is the same as the other sequencers.
+
+    """
+    def __init__(self, bucket_width=None, n_buckets=2):
+        self._auto_width = bucket_width is None
+        if self._auto_width:
+            bucket_width = 1.0
+        self._width = float(bucket_width)
+        self._min_buckets = n_buckets
+        self.clear()
+
+    def clear(self):
+        super(CalendarSequencer, self).clear()
+        self._new_buckets(self._min_buckets)
+        self._n_events = 0
+        self._seq_numbers = count(1)
+        # "Virtual" index (=time // width) of the current bucket.
+        self._i_virtual = 0
+
+    def _new_buckets(self, n_buckets):
+        self._buckets = [[] for _ in range(n_buckets)]
+        self._n_buckets = n_buckets
+        self._grow_size = 2 * n_buckets
+        self._shrink_size = (
+            n_buckets // 2 if n_buckets > self._min_buckets else -1)
+
+    @property
+    def events(self):
+        """The pending events, in order (a sorted copy of the queue)."""
+        entries = sorted(entry
+                         for bucket in self._buckets
+                         for entry in bucket)
+        return [entry[-1] for entry in entries if entry[-1].pending]
+
+    def _n_queued(self):
+        return self._n_events
+
+    def _compact(self):
+        for bucket in self._buckets:
+            bucket[:] = [entry for entry in bucket if entry[-1].pending]
+        self._n_events = sum(len(bucket) for bucket in self._buckets)
+
+    def _queued_events(self):
+        return [entry[-1] for bucket in self._buckets for entry in bucket]
+
+    def _get_queue(self):
+        return (self._width, self._i_virtual, self._n_events,
+                [list(bucket) for bucket in self._buckets])
+
+    def _set_queue(self, queue):
+        width, i_virtual, n_events, buckets = queue
+        self._new_buckets(len(buckets))
+        self._buckets = [list(bucket) for bucket in buckets]
+        self._width = width
+        self._i_virtual = i_virtual
+        self._n_events = n_events
+
+    @property
+    def bucket_width(self):
+        return self._width
+
+    def add(self, event):
+        event = _make_event(event)
+        event.seq = next(self._seq_numbers)
+        event.pending = True
+        time = event.time
+        entry = (time, -event.priority, event.seq, event)
+        i_virtual = int(time // self._width)
+        if self._n_events == 0 or i_virtual < self._i_virtual:
+            # N.B. includes adding an event 'in the past'.
+            self._i_virtual = i_virtual
+        insort(self._buckets[i_virtual % self._n_buckets], entry)
+        self._n_events += 1
+        if self._n_events > self._grow_size:
+            self._resize(2 * self._n_buckets)
+        return event
+
+    def addall(self, events):
+        if events:
+            if not isinstance(events, list):
+                return [self.add(events)]
+            if (len(events) < BULK_ADD_SIZE or
+                    self._n_events + len(events) <= self._grow_size):
+                return [self.add(event) for event in events]
+            # Re-bucket everything, just once.
+            with _gc_paused():
+                events, entries = self._new_entries(events)
+                self._n_events += len(entries)
+                n_buckets = self._n_buckets
+                while self._n_events > 2 * n_buckets:
+                    n_buckets *= 2
+                self._resize(n_buckets, entries)
+            return events
+
+    def _next_bucket(self):
+        # Find the bucket containing the next event, and make it current.
+        buckets = self._buckets
+        n_buckets = self._n_buckets
+        width = self._width
+        i_virtual = self._i_virtual
+        for _ in range(n_buckets):
+            bucket = buckets[i_virtual % n_buckets]
+            if bucket and bucket[0][0] // width <= i_virtual:
+                self._i_virtual = i_virtual
+                return bucket
+            i_virtual += 1
+        # Nothing within a "year" : go directly to the earliest event.
+        time = min(bucket[0] for bucket in buckets if bucket)[0]
+        self._i_virtual = int(time // width)
+        return buckets[self._i_virtual % n_buckets]
+
+    def _estimate_width(self, entries):
+        # Estimate a good bucket width from the earliest event separations.
+        times = [entry[0] for entry in nsmallest(25, entries)]
+        gaps = [t1 - t0 for t0, t1 in zip(times[:-1], times[1:])]
+        gaps = [gap for gap in gaps if gap > 0]
+        if gaps:
+            mean_gap = sum(gaps) / len(gaps)
+            # Ignore any very large separations.
+            gaps = [gap for gap in gaps if gap <= 2.0 * mean_gap]
+            self._width = 3.0 * sum(gaps) / len(gaps)
+
+    def _resize(self, n_buckets, new_entries=()):
+        entries = [entry for bucket in self._buckets for entry in bucket]
+        entries.extend(new_entries)
+        if self._auto_width:
+            self._estimate_width(entries)
+        self._new_buckets(n_buckets)
+        width = self._width
+        buckets = self._buckets
+        entries.sort()
+        for entry in entries:
+            # N.B. adding in order, so each bucket stays sorted.
+            buckets[int(entry[0] // width) % n_buckets].append(entry)
+        if entries:
+            self._i_virtual = int(entries[0][0] // width)
+
+    def run(self, stop=None):
+        updates = self._updates
+        while self._n_events or updates:
+            if updates and (not self._n_events or
+                            self._next_bucket()[0][0] > self._update_time):
+                # End of a timestep : run its updates.
+                self._run_updates()
+                continue
+            bucket = self._next_bucket()
+            time = bucket[0][0]
+            if (stop is not None and
+                    time > stop):
+                break
+            event = bucket.pop(0)[-1]
+            self._n_events -= 1
+            if self._n_events < self._shrink_size:
+                self._resize(self._n_buckets // 2)
+            if not event.pending:
+                # Cancelled.
+                self._n_cancelled -= 1
+                continue
+            event.pending = False
+            self.time = time
+            new_evs = event.call(time, *event.args)
+            self.addall(new_evs)
+
+
+# The standard sequencer type.
+Sequencer = HeapSequencer
+
+# Available sequencer types, by name.
+SEQUENCER_TYPES = {
+    'list': ListSequencer,
+    'heap': HeapSequencer,
+    'calendar': CalendarSequencer,
+}
+
+
+def new_sequencer(kind='heap', *args, **kwargs):
+    """Make a new sequencer of the given kind (a key of SEQUENCER_TYPES)."""
+    if kind not in SEQUENCER_TYPES:
+        msg = 'Unknown sequencer kind {!r} : options are {}.'
+        raise ValueError(msg.format(kind, sorted(SEQUENCER_TYPES.keys())))
+    return SEQUENCER_TYPES[kind](*args, **kwargs)
+
 # Default sequencer
 DEFAULT_SEQUENCER = Sequencer()
@@ -1,6 +1,28 @@
+from sim.simulation import current_simulation, _ObjectRegistry
+
 SIG_START_DEFAULT = 0
 SIG_UNDEF = 'undefined'
 
+# All signals, by simulation name and signal name.
+# This is used to rebind pickled references to signals.
+_SIGNALS = _ObjectRegistry('signal')
+
+
+def find_signal(name, simulation_name=None):
+    """
+    Get the signal of the given name.
+
+    From the current Simulation, if any, or else the only one of that name in
+    the named simulation (None for no simulation).
+
+    """
+    simulation = current_simulation()
+    if simulation is not None:
+        signal = simulation.signals.get(name)
+        if signal is not None:
+            return signal
+    return _SIGNALS.find(name, simulation_name)
+
 
 class Signal(object):
     def __init__(self, name, start_state=None):
@@ -11,6 +33,18 @@ class Signal(object):
             self.state = SIG_START_DEFAULT
         self.previous = self.state
         self.conns = list()
+        # Number of filtered connections (see 'add_connection').
+        self._n_filtered = 0
+        simulation = current_simulation()
+        self._simulation_name = None
+        if simulation is not None:
+            self._simulation_name = simulation.name
+            simulation.add_signal(self)
+        _SIGNALS.add(self, self._simulation_name)
+
+    def __reduce__(self):
+        # Pickle as a reference to a signal of the same name (and simulation).
+        return (find_signal, (self.name, self._simulation_name))
 
     def __str__(self):
         msg = 'Sig<{}={}>'
@@ -20,18 +54,85 @@ class Signal(object):
     def set(self, time, state):
         self.previous = self.state
         self.state = state
+        if self._n_filtered:
+            self._set_filtered(time)
+            return
         for conn in self.conns:
             # TODO: should really send only the state, not itself ??
             # current form for access to .state and .previous (?.name? : not really)
             # NEEDED for trace, in current form.  But device tracing is nicer ...
             conn(time, self)
 
-    def add_connection(self, call, index=-1):
+    def _set_filtered(self, time):
+        # As 'set', but with filtered connections :  The filters are applied
+        # here, so uninteresting calls are never made.
+        state, previous = self.state, self.previous
+        if state.__class__ is not int or previous.__class__ is not int:
+            for conn in self.conns:
+                if conn.__class__ is not FilteredConnection:
+                    conn(time, self)
+                elif conn.passes(state, previous):
+                    conn.call(time, conn.view)
+            return
+        # Integer states (the usual case) : filter with bitwise operations,
+        # and without any extra calls.
+        changed = state ^ previous
+        for conn in self.conns:
+            if conn.__class__ is not FilteredConnection:
+                conn(time, self)
+                continue
+            change_bits = conn.change_bits
+            if change_bits and not changed & change_bits:
+                continue
+            nonzero_bits = conn.nonzero_bits
+            if nonzero_bits and not state & nonzero_bits:
+                continue
+            view = conn.view
+            mask = conn.mask
+            if mask is None:
+                view.state, view.previous = state, previous
+            else:
+                shift = conn.shift
+                view.state = (state >> shift) & mask
+                view.previous = (previous >> shift) & mask
+            conn.call(time, view)
+
+    def add_connection(self, call, index=-1,
+                       mask=None, shift=0, edge=None):
+        """
+        Connect a call, as "call(time, signal)", to events on this signal.
+
+        A connection may also select some bits, as "(state >> shift) & mask",
+        and/or filter events by 'edge' :  'change' passes only events which
+        change the (selected) state, and 'nonzero' only those with a
+        (selected) state that is not 0.
+        Filtered connections are called with a view of the signal, which has
+        the selected 'state' and 'previous' values.
+        Non-numeric states, e.g. SIG_UNDEF, are passed unchanged.
+
+        """
+        if mask is not None or shift or edge is not None:
+            call = FilteredConnection(self, call, mask, shift, edge)
         self.conns[index:index] = [call]
+        self._count_filtered()
 
     def remove_connection(self, call):
-        while call in conns:
-            self.conns.remove(call)
+        self.conns[:] = [conn for conn in self.conns
+                         if conn != call and getattr(conn, 'call', None) != call]
+        self._count_filtered()
+
+    def replace_connection(self, old_call, new_call):
+        """Replace a connected call (filtered or not) with another."""
+        for i_conn, conn in enumerate(self.conns):
+            if conn == old_call:
+                self.conns[i_conn] = new_call
+            elif conn.__class__ is FilteredConnection and \
+                    conn.call == old_call:
+                conn.call = new_call
+
+    def _count_filtered(self):
+        self._n_filtered = sum(1 for conn in self.conns
+                               if conn.__class__ is FilteredConnection)
 
     def trace(self):
         self.add_connection(signal_trace, 0)
@@ -40,6 +141,145 @@ class Signal(object):
         self.conns.remove(signal_trace)
 
 
+class LazySignal(Signal):
+    """
+    A signal whose state can be computed on demand.
+
+    After 'invalidate', the state is recomputed by "evaluate()" when it is
+    next read, and then cached.  Setting the state (e.g. by 'set') makes it
+    valid again.
+    Adding a connection also refreshes the state, so that the next 'set'
+    records the value from before it as 'previous'.
+
+    """
+    def __init__(self, name, evaluate, start_state=None):
+        self._evaluate = evaluate
+        self._stale = False
+        super(LazySignal, self).__init__(name, start_state)
+
+    @property
+    def state(self):
+        if self._stale:
+            self._state = self._evaluate()
+            self._stale = False
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        self._state = state
+        self._stale = False
+
+    def invalidate(self):
+        """Mark the state as out of date."""
+        self._stale = True
+
+    def add_connection(self, *args, **kwargs):
+        # Evaluate a stale state now, while it still matches the inputs :
+        # once connected, the state is only updated by 'set'.
+        self.state
+        super(LazySignal, self).add_connection(*args, **kwargs)
+
+
+class FilteredConnection(object):
+    """
+    A signal connection with a bit selection and/or an edge filter.
+
+    Made by 'Signal.add_connection', and applied by 'Signal.set'.
+    It is also callable, like a plain connection.
+
+    """
+    EDGES = (None, 'change', 'nonzero')
+
+    __slots__ = ('call', 'mask', 'shift', 'edge', 'changes', 'nonzero',
+                 'bits', 'change_bits', 'nonzero_bits', 'view')
+
+    def __init__(self, signal, call, mask=None, shift=0, edge=None):
+        if edge not in self.EDGES:
+            msg = 'Unknown connection edge filter {!r} : expected one of {}.'
+            raise ValueError(msg.format(edge, self.EDGES))
+        self.call = call
+        # N.B. a shift with no mask selects all the bits above the shift.
+        self.mask = -1 if mask is None and shift else mask
+        self.shift = shift
+        self.changes = edge == 'change'
+        self.nonzero = edge == 'nonzero'
+        self.edge = edge
+        # All the selected bits, in place (-1 for all of them).
+        self.bits = -1 if self.mask is None else self.mask << shift
+        # Bits which must change, or be nonzero, for a call (for integer
+        # states :  0 means no filter).
+        self.change_bits = self.bits if self.changes else 0
+        self.nonzero_bits = self.bits if self.nonzero else 0
+        # The signal, as seen through the filter.
+        self.view = SignalView(signal, mask, shift)
+
+    def __repr__(self):
+        return 'FilteredConnection<{}: {}, edge={}>'.format(
+            self.view.name, self.call, self.edge)
+
+    def passes(self, state, previous):
+        """
+        Update the view to a new signal event, and return whether the event
+        passes the filter.
+
+        """
+        view = self.view
+        if self.mask is not None:
+            if isinstance(state, (int, float)):
+                state = (int(state) >> self.shift) & self.mask
+            if isinstance(previous, (int, float)):
+                previous = (int(previous) >> self.shift) & self.mask
+        view.state, view.previous = state, previous
+        if self.changes and state == previous:
+            return False
+        if self.nonzero and state == 0:
+            return False
+        return True
+
+    def __call__(self, time, signal):
+        if self.passes(signal.state, signal.previous):
+            self.call(time, self.view)
+
+
+class SignalView(object):
+    """The selected bits of a signal, as passed by a FilteredConnection."""
+    def __init__(self, signal, mask=None, shift=0):
+        self.signal = signal
+        self.name = signal.name
+        if mask is not None:
+            self.name += '[{}:{:#x}]'.format(shift, mask)
+        elif shift:
+            self.name += '[{}:]'.format(shift)
+        self.state = signal.state
+        self.previous = signal.previous
+
+    def __str__(self):
+        return 'Sig<{}={}>'.format(self.name, self.state)
+
+
+class SetState(object):
+    """
+    A callable to set a signal state, e.g. as a stimulus event.
+
+    Unlike a closure or lambda, this can be pickled.
+
+    """
+    def __init__(self, signal, state):
+        self.signal = signal
+        self.state = state
+
+    def __call__(self, time):
+        self.signal.set(time, self.state)
+
+    def __repr__(self):
+        return 'SetState<{}={!r}>'.format(self.signal.name, self.state)
+
+
+def setsig(time, sig, val):
+    """Make an event which sets a signal state at a given time."""
+    return (time, SetState(sig, val))
+
+
 def signal_trace(time, sig):
     msg = '@{}: Sig<{}> {} ==> {}'
     msg = msg.format(
@@ -0,0 +1,151 @@
+"""
+Simulation contexts.
+
+A Simulation owns a sequencer, and keeps a registry of the devices and
+signals built for it.  Any number of independent simulations can exist side
+by side, e.g. for parameter sweeps.
+
+Devices and signals created inside a "with simulation:" block belong to that
+simulation :  Devices use its sequencer (unless given another).
+
+A simulation may also set the state checking level (see sim.checks), which
+then applies while it runs, in the thread running it.
+
+"""
+from collections import OrderedDict
+import threading
+import weakref
+
+from sim.checks import check_level
+from sim.sequencer import Sequencer
+
+# Stack of active simulation contexts (each thread has its own).
+_CONTEXT = threading.local()
+
+
+def current_simulation():
+    """Return the innermost active Simulation, or None."""
+    stack = getattr(_CONTEXT, 'stack', None)
+    return stack[-1] if stack else None
+
+
+class _ObjectRegistry(object):
+    """
+    A weak registry of all the named objects of one kind (devices or signals),
+    used to rebind pickled references.
+
+    Objects are registered by (simulation name, object name), where the
+    simulation name is None outside of any simulation.  Names need not be
+    unique, but a lookup which matches more than one live object is an error,
+    rather than a guess.
+    Each entry is removed when its object is deleted, so discarded
+    simulations leave nothing behind.
+
+    """
+    def __init__(self, kind):
+        self.kind = kind
+        # Weak references to the objects, by (simulation name, name).
+        self._refs = {}
+
+    def add(self, obj, simulation_name):
+        key = (simulation_name, obj.name)
+        refs = self._refs.get(key, [])
+        refs = [ref for ref in refs if ref() is not None]
+        refs.append(weakref.ref(obj, self._remover(key)))
+        self._refs[key] = refs
+
+    def _remover(self, key):
+        # Make a weakref callback, to drop the entry of a deleted object.
+        # N.B. refers weakly to the registry, so as not to keep it alive.
+        self_ref = weakref.ref(self)
+
+        def remove(ref):
+            registry = self_ref()
+            if registry is not None:
+                refs = registry._refs.get(key, [])
+                refs = [other for other in refs if other is not ref]
+                if refs:
+                    registry._refs[key] = refs
+                else:
+                    registry._refs.pop(key, None)
+        return remove
+
+    def _live(self, key):
+        objects = [ref() for ref in self._refs.get(key, [])]
+        return [obj for obj in objects if obj is not None]
+
+    def objects(self):
+        """All the live objects."""
+        return [obj for key in list(self._refs) for obj in self._live(key)]
+
+    def find(self, name, simulation_name=None):
+        """Get the single live object of a name (in a named simulation)."""
+        objects = self._live((simulation_name, name))
+        where = ''
+        if simulation_name is not None:
+            where = ' in simulation {!r}'.format(simulation_name)
+        if not objects:
+            msg = 'No {} named {!r}{}.'
+            raise ValueError(msg.format(self.kind, name, where))
+        if len(objects) > 1:
+            msg = '{} {}s named {!r}{} : cannot choose one.'
+            msg = msg.format(len(objects), self.kind, name, where)
+            # N.B. don't keep the objects alive in the traceback.
+            del objects[:]
+            raise ValueError(msg)
+        return objects[0]
+
+
+class Simulation(object):
+    def __init__(self, name='sim', sequencer=None, check_level=None):
+        self.name = name
+        self.seq = sequencer or Sequencer()
+        # None means "use the current check level".
+        self.check_level = check_level
+        self.devices = OrderedDict()
+        self.signals = OrderedDict()
+
+    def __str__(self):
+        return 'Simulation<{}: {} devices, {} signals>'.format(
+            self.name, len(self.devices), len(self.signals))
+
+    def __enter__(self):
+        if getattr(_CONTEXT, 'stack', None) is None:
+            _CONTEXT.stack = []
+        _CONTEXT.stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _CONTEXT.stack.remove(self)
+
+    def _add(self, registry, obj, kind):
+        # Names must be unique within a simulation.
+        if obj.name in registry and registry[obj.name] is not obj:
+            msg = 'Simulation {!r} already has a {} named {!r}.'
+            raise ValueError(msg.format(self.name, kind, obj.name))
+        registry[obj.name] = obj
+
+    def add_device(self, device):
+        self._add(self.devices, device, 'device')
+
+    def add_signal(self, signal):
+        self._add(self.signals, signal, 'signal')
+
+    def run(self, stop=None):
+        if self.check_level is None:
+            self.seq.run(stop)
+        else:
+            with check_level(self.check_level):
+                self.seq.run(stop)
+
+    def fuse(self, inline_joins=False):
+        """Fuse pseudo-devices into signal connections (see sim.netlist)."""
+        from sim.netlist import fuse
+        return fuse(self, inline_joins=inline_joins)
+
+    def checkpoint(self):
+        """Make a Checkpoint of the whole simulation state."""
+        from sim.checkpoint import Checkpoint
+        return Checkpoint(self.seq,
+                          list(self.devices.values()) +
+                          list(self.signals.values()))
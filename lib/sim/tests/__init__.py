@@ -3,12 +3,8 @@
 from sim.device import okeq, okin
 
 
-# util, needs a place to live
-def setsig(time, sig, val):
-    def _call(t):
-        sig.set(t, val)
-
-    return (time, _call)
+# util, now lives in sim.signal
+from sim.signal import setsig
 
 
 from contextlib import contextmanager
@@ -0,0 +1,54 @@
+from sim.sequencer import DEFAULT_SEQUENCER as SEQ
+from sim.bbc.code import code, instruction
+from sim.bbc.machine import build_bbc, CONTROL_BITS
+
+from sim.tests import okeq, okin, fails
+
+timings = [10.0, 2.5, 12.0, 20.0, 10.0, 10.0]
+m1 = build_bbc(timings=timings)
+m2 = build_bbc(program=[instruction('LDI', 7), instruction('ADI', 3)],
+               timings={'t_p0_Next': 10.0})
+print(m1)
+
+print('check machines are independent')
+okeq(m1.seq is m2.seq, False)
+okeq(m1.seq is SEQ, False)
+okeq(m1.cycle.phase_durations, timings)
+okeq(m2.cycle.phase_durations[:2], [10.0, 2.5])
+okeq(m1.pm_ir._rom, [instr[1] for instr in code])
+okeq(m2.pm_k._rom, [7, 3])
+for attr_name, signame in CONTROL_BITS:
+    okeq(getattr(m1, attr_name).name, signame)
+okeq(m1.simulation.devices['ir'] is m1.ir, True)
+okeq(m2.simulation.devices['ir'] is m2.ir, True)
+
+print('check bad timings are rejected')
+with fails(ValueError):
+    build_bbc(timings=timings + [10.0])
+with fails(ValueError):
+    build_bbc(timings=timings[:5])
+with fails(ValueError):
+    build_bbc(timings={'t_6': 10.0})
+
+print('check a machine fetches its first instruction')
+m1.start()
+m2.start()
+m1.run(50.)
+# The first 'next' phase increments the PM address to 1.
+okeq(m1.count_pm_addr.output.state, 1)
+okeq(m1.ir.output.state, code[1][1] & 0x7f)
+okeq(m1.pm_k.out.state, code[1][2])
+okeq(m2.ir.output.state, 0)  # not yet run
+m2.run(50.)
+okeq(m2.ir.output.state, instruction('ADI')[1] & 0x7f)
+
+print('check the IR is cleared at the start of each cycle')
+ir_events = []
+m1.ir.output.add_connection(
+    lambda time, sig: ir_events.append((time, sig.state)))
+m1.run(100.)
+# The second cycle starts at 64.5 :  'address PM' begins 10.0 later, and the
+# latch output delay is 5.0.
+okeq(ir_events[:2], [(74.5, 'undefined'), (79.5, 0)])
+okeq(m1.ir.output.state, code[2][1] & 0x7f)
+print('')
@@ -0,0 +1,79 @@
+from sim.signal import Signal, SIG_UNDEF
+from sim.sequencer import DEFAULT_SEQUENCER as SEQ
+from sim.checkpoint import Checkpoint
+
+from sim.tests import okeq, okin, setsig, fails
+
+from sim.device.arith import Counter
+from sim.device.pulse_ram import PulseRam
+from sim.device.wire import Wire
+
+SEQ.clear()
+
+counter = Counter('chk_count', n_bits=3)
+din = Signal('chk_din')
+counter.connect('input', din)
+
+ram = PulseRam('chk_ram')
+addr = Signal('chk_addr')
+ard = Signal('chk_ard')
+aclr = Signal('chk_aclr')
+ram.connect('addr', addr)
+ram.connect('x_read', ard)
+ram.connect('x_aclr', aclr)
+data = Signal('chk_data')
+ram.connect('d_in', data)
+# A delayed copy of the counter value (without the unsettled periods).
+wire = Wire('chk_wire', delay=5., inertial=True)
+wire.connect('input', counter.output)
+
+RESULTS = []
+wire.output.add_connection(
+    lambda t, sig: RESULTS.append((t, 'count', sig.state)))
+ram.out.add_connection(
+    lambda t, sig: RESULTS.append((t, 'ram', sig.state)))
+
+stimulus_signals = [din, addr, ard, aclr, data]
+
+
+def stimulus(t0, value):
+    SEQ.addall([
+        setsig(t0, addr, value % 4),
+        setsig(t0 + 10., ard, '!'),
+        setsig(t0 + 15., din, 1),
+        setsig(t0 + 20., data, value + 1),
+        setsig(t0 + 40., aclr, '!'),
+    ])
+
+
+for i_cycle in range(6):
+    stimulus(100. * i_cycle, i_cycle)
+
+SEQ.run(250.)
+print('checkpoint @250')
+checkpoint = Checkpoint(SEQ, [counter, ram] + stimulus_signals)
+okin(ram, checkpoint.devices)
+okin(wire, checkpoint.devices)
+okin(counter.output, checkpoint.signals)
+
+RESULTS = []
+SEQ.run()
+first_run = RESULTS
+okeq(counter.output.state, 6)
+okeq(len(first_run) > 0, True)
+
+print('restore and rerun')
+checkpoint.restore()
+okeq(counter.output.state, 3)
+RESULTS = []
+SEQ.run()
+okeq(RESULTS, first_run)
+
+print('restore again, and vary the stimulus')
+checkpoint.restore()
+RESULTS = []
+SEQ.add(setsig(260., din, 1))
+SEQ.run()
+okeq(counter.output.state, 7)
+okeq(RESULTS == first_run, False)
+print('')
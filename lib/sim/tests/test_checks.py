@@ -0,0 +1,114 @@
+import threading
+
+from sim.signal import Signal, setsig
+from sim.simulation import Simulation
+from sim.checks import get_check_level, set_check_level, check_level
+from sim.checks import StateSet, okstate, SAMPLE_EVERY, _THREAD
+import sim.device.pulse_ram as pulse_ram
+import sim.device.table as device_table
+from sim.device.pulse_ram import PulseRam
+
+from sim.tests import okeq, okin, fails
+
+
+def ram_sim(level=None):
+    # A RAM with a too-fast second address change : a state violation.
+    with Simulation('checks', check_level=level) as sim:
+        ram = PulseRam('check_ram')
+        addr = Signal('check_addr')
+        ram.connect('addr', addr)
+    sim.seq.addall([setsig(100.0, addr, 1),
+                    setsig(100.5, addr, 2)])
+    return sim, ram
+
+
+print('check the default level is full checking')
+okeq(get_check_level(), 'full')
+sim, ram = ram_sim()
+with fails(ValueError):
+    sim.run()
+
+print('check a simulation can run without checks')
+sim, ram = ram_sim('off')
+sim.run()
+okeq(ram._addr, 2)
+# ... and the level is restored after the run.
+okeq(get_check_level(), 'full')
+with fails(ValueError):
+    pulse_ram.okeq(1, 2)
+
+print('check the level context, and sampled checking')
+with check_level('off'):
+    okeq(get_check_level(), 'off')
+    pulse_ram.okeq(1, 2)
+    device_table.okstate(pulse_ram.IDLE, pulse_ram.WRITING,
+                         pulse_ram.RAM_STATES)
+okeq(get_check_level(), 'full')
+with check_level('sampled', sample_every=3):
+    # The first call of every 3 is checked.
+    n_fails = 0
+    for i_call in range(9):
+        try:
+            pulse_ram.okeq(1, 2)
+        except ValueError:
+            n_fails += 1
+    okeq(n_fails, 3)
+with fails(ValueError):
+    pulse_ram.okeq(1, 2)
+# ... and the sample interval is restored too.
+okeq(_THREAD.every, SAMPLE_EVERY)
+
+print('check the level belongs to a thread')
+results = []
+
+
+def run_in_thread():
+    # A new thread starts with full checking, and can run a simulation with
+    # its own check level.
+    results.append(get_check_level())
+    sim, ram = ram_sim('off')
+    sim.run()
+    results.append(ram._addr)
+    set_check_level('off')
+    results.append(get_check_level())
+
+
+with check_level('sampled'):
+    thread = threading.Thread(target=run_in_thread)
+    thread.start()
+    thread.join()
+    okeq(get_check_level(), 'sampled')
+okeq(results, ['full', 2, 'off'])
+okeq(get_check_level(), 'full')
+
+print('check bad levels are rejected')
+with fails(ValueError):
+    set_check_level('some')
+with fails(ValueError):
+    set_check_level('sampled', sample_every=0)
+okeq(get_check_level(), 'full')
+
+print('check bit-coded states, and their readable failure messages')
+states = StateSet('idle', 'busy', 'done')
+idle, busy, done = states.codes
+okeq(states.codes, (1, 2, 4))
+okeq(states.mask('idle', 'done'), idle | done)
+okeq(states.mask_names(idle | done), ('idle', 'done'))
+okeq(states.name(busy), 'busy')
+okstate(busy, idle | busy, states)
+with fails(ValueError):
+    okstate(busy, idle, states)
+message = None
+try:
+    okstate(busy, idle | done, states)
+except ValueError as err:
+    message = str(err)
+okeq(message, "!Check fail: 'busy' not in ('idle', 'done').")
+# The device checks still report state names.
+sim, ram = ram_sim()
+message = None
+try:
+    sim.run()
+except ValueError as err:
+    message = str(err)
+okeq(message, "!Check fail: 'set-addr' != 'idle'.")
@@ -1,9 +1,11 @@
+import random
+
 from sim.signal import Signal, SIG_UNDEF
-from sim.sequencer import DEFAULT_SEQUENCER as SEQ
+from sim.sequencer import DEFAULT_SEQUENCER as SEQ, Sequencer
 
 from sim.tests import okeq, okin, setsig, fails
 
-from sim.device.arith import Counter
+from sim.device.arith import Counter, BehaviouralCounter
 
 
 counter = Counter(
@@ -123,3 +125,121 @@ SEQ.addall([
 SEQ.run()
 okeq(counter.output.state, 1)
 okeq(COUNTER_CARRYOUTS_COUNT, 1)
+
+
+print('check the behavioural counter against the structural one')
+
+CMP_TIMINGS = {
+    't_toggle_0_to_1': 3.,
+    't_toggle_1_to_0': 2.5,
+    't_out_2_carry': 1.5,
+    't_clear_2_carry': 2.,
+    't_clear_onoff': 4.}
+
+
+def run_counter(counter_class, stimuli, n_bits=5):
+    # Run a counter, returning its output events, carry-out events and
+    # final output.
+    seq = Sequencer()
+    counter = counter_class('cmp_count', n_bits=n_bits,
+                            onebit_kwargs=CMP_TIMINGS, sequencer=seq)
+    signals = {'in': Signal('cmp_in'), 'clr': Signal('cmp_clr')}
+    counter.connect('input', signals['in'])
+    counter.connect('clear', signals['clr'])
+    outputs, carries = [], []
+    counter.output.add_connection(
+        lambda time, sig: outputs.append((time, sig.state)))
+    counter.x_carry_out.add_connection(
+        lambda time, sig: carries.append((time, sig.state)))
+    seq.addall([setsig(time, signals[name], value)
+                for time, name, value in stimuli])
+    seq.run()
+    return outputs, carries, counter.output.state
+
+
+def check_same(stimuli):
+    # Check the behavioural results are those of the structural counter,
+    # with the intermediate values of carry ripples left out.
+    outputs, carries, value = run_counter(Counter, stimuli)
+    b_outputs, b_carries, b_value = run_counter(BehaviouralCounter, stimuli)
+    okeq(b_carries, carries)
+    okeq(b_value, value)
+    okeq([event for event in outputs if event in b_outputs], b_outputs)
+    for event, next_event in zip(outputs, outputs[1:] + [None]):
+        if event not in b_outputs:
+            # Either a repeat of 'undefined', or an intermediate value.
+            okeq(SIG_UNDEF in (event[1], next_event[1]), True)
+
+
+check_same([
+    (10., 'in', 1),
+    (40., 'in', 7),  # 1 + 7 : carry ripples up to bit 3.
+    (70., 'in', 31),  # Carry-out.
+    (100., 'in', 1),
+    (104., 'in', 16),  # Overlaps the ripple :  bit 4 is still idle.
+    (120., 'in', 1),
+    (125.5, 'in', 1),  # Also overlapping, but bit 0 is done.
+    (160., 'clr', 1),  # Drops stored '1's.
+    (190., 'in', 3),  # Dropped while clearing.
+    (220., 'clr', 0),
+    (250., 'in', 30),
+])
+
+# Random sequences :  Where the structural counter fails, so must the
+# behavioural one.
+n_compared = 0
+for seed in range(40):
+    rand = random.Random(seed)
+    stimuli = []
+    time = 0.
+    clearing = 0
+    for _ in range(12):
+        if rand.random() < 0.1:
+            clearing = 1 - clearing
+            stimuli.append((time + 30., 'clr', clearing))
+            time += 40.
+        else:
+            time += rand.choice([30., 9., 13.])
+            stimuli.append((time, 'in', rand.choice([1, 1, 2, 3, 4, 16, 31])))
+    try:
+        run_counter(Counter, stimuli)
+    except ValueError:
+        with fails(ValueError):
+            run_counter(BehaviouralCounter, stimuli)
+        continue
+    check_same(stimuli)
+    n_compared += 1
+okeq(n_compared > 10, True)
+
+
+print('check an opted-in lazy output')
+
+
+def run_unconnected(lazy_output):
+    # Count on a counter with nothing connected to its output.
+    seq = Sequencer()
+    counter = Counter('lazy_count', n_bits=4, onebit_kwargs=CMP_TIMINGS,
+                      lazy_output=lazy_output, sequencer=seq)
+    din = Signal('lazy_in')
+    counter.connect('input', din)
+    updates = []
+    add_update = seq.add_update
+
+    def counting_add_update(time, call, args=()):
+        updates.append(time)
+        return add_update(time, call, args)
+    seq.add_update = counting_add_update
+    seq.addall([setsig(10. + 30. * i_count, din, 1)
+                for i_count in range(5)])
+    seq.run()
+    return len(updates), counter.output.state
+
+
+# The output is only lazy if asked for.
+okeq(type(Counter('default_count', n_bits=2).output), Signal)
+n_updates, value = run_unconnected(lazy_output=False)
+n_lazy_updates, lazy_value = run_unconnected(lazy_output=True)
+okeq(value, 5)
+okeq(lazy_value, value)
+okeq(n_lazy_updates, 0)
+okeq(n_updates > 0, True)
@@ -7,6 +7,8 @@ from sim.signal import Signal
 from sim.sequencer import DEFAULT_SEQUENCER as SEQ
 from sim.device import Device, Action, ClockTick
 
+from sim.tests import okeq
+
 # Test device (clock tick)
 clk = ClockTick('clock_01', period=10)
 print(clk)
@@ -30,3 +32,72 @@ clk.hook('start', start_input_hook)
 clk.hook('tick', tick_action_hook)
 startsig.set(5, 'go')
 SEQ.run(60)
+
+print('\ncheck unhooked, untraced methods are the plain ones')
+clk.unhook('start', start_input_hook)
+clk.untrace('start')
+okeq('start' in clk.__dict__, False)
+okeq(startsig.conns[-1], clk.start)
+clk2 = ClockTick('clock_02', period=10)
+okeq('tick' in clk2.__dict__, False)
+okeq('tick' in clk.__dict__, True)  # still traced + hooked
+
+print('check hooks added after connecting still see signal inputs')
+seen = []
+clk2.connect('start', startsig)
+clk2.hook('start', lambda dev, time, signal: seen.append((time, dev.name)))
+startsig.set(100, 'go-again')
+okeq(seen, [(100, 'clock_02')])
+clk2.hook('start', lambda dev, time, signal: seen.append('second'))
+startsig.set(101, 'go-again')
+okeq(seen[1:], [(101, 'clock_02'), 'second'])
+SEQ.clear()
+
+print('check hooks added later see queued actions and raw connections')
+clk3 = ClockTick('clock_03', period=100)
+raw_start = Signal('raw_start')
+raw_start.add_connection(clk3.start)
+clk3.act(200., 'tick')
+SEQ.add((210., Action(clk3, 'tick')))
+seen = []
+
+
+def start_hook(device, time, signal):
+    seen.append(('start', time))
+
+
+def tick_hook(device, time):
+    seen.append(('tick', time))
+
+
+clk3.hook('start', start_hook)
+clk3.hook('tick', tick_hook)
+raw_start.set(195., 'go')
+SEQ.run(250.)
+okeq(seen, [('start', 195.), ('tick', 195.), ('tick', 200.), ('tick', 210.)])
+# ... and are removed from them again.
+clk3.unhook('start', start_hook)
+clk3.unhook('tick', tick_hook)
+okeq(raw_start.conns, [clk3.start])
+okeq('tick' in clk3.__dict__, False)
+SEQ.run(350.)
+okeq(len(seen), 4)
+SEQ.clear()
+
+print('check actions pass both stored and call-time arguments')
+
+
+class _Recorder(Device):
+    @Device.action
+    def record(self, time, *args, **kwargs):
+        self.calls.append((time, args, kwargs))
+
+
+rec = _Recorder('recorder')
+rec.calls = []
+Action(rec, 'record', 1, 2)(5)
+Action(rec, 'record', 1, a=3)(6)
+Action(rec, 'record', a=3, b=4)(7, b=5, c=6)
+okeq(rec.calls, [(5, (1, 2), {}),
+                 (6, (1,), {'a': 3}),
+                 (7, (), {'a': 3, 'b': 5, 'c': 6})])
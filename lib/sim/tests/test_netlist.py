@@ -0,0 +1,103 @@
+from collections import Counter as Multiset
+
+from sim.signal import Signal, setsig
+from sim.sequencer import Sequencer
+from sim.simulation import Simulation
+from sim.bbc.machine import build_bbc, CONTROL_BITS
+from sim.device.pseudo_devices import SigBitslice, SigJoin, SigSendCopy
+from sim.device.arith import Counter
+from sim.netlist import fuse, fused_devices
+
+from sim.tests import okeq, okin, fails
+
+
+def record_all(simulation):
+    # Record every signal event, in order.
+    record = []
+    for signal in simulation.signals.values():
+        def recorder(time, sig, record=record):
+            record.append((time, sig.name, sig.state))
+        # N.B. after all other connections.
+        signal.conns.append(recorder)
+    return record
+
+
+def count_events(seq):
+    # Count the events queued, and the update-region calls added.
+    counts = {'queued': 0, 'updates': 0}
+    add, add_update = seq.add, seq.add_update
+
+    def counting_add(event):
+        counts['queued'] += 1
+        return add(event)
+
+    def counting_add_update(time, call, args=()):
+        result = add_update(time, call, args)
+        counts['queued' if result is not None else 'updates'] += 1
+        return result
+    seq.add = counting_add
+    seq.add_update = counting_add_update
+    return counts
+
+
+def run_bbc(do_fuse, n_cycles=12, inline_joins=False):
+    timings = [30.0, 2.5, 12.0, 20.0, 10.0, 10.0]
+    machine = build_bbc(timings=timings)
+    fused = []
+    if do_fuse:
+        fused = machine.simulation.fuse(inline_joins=inline_joins)
+    record = record_all(machine.simulation)
+    machine.event_counts = count_events(machine.seq)
+    machine.start(0.0)
+    machine.run(n_cycles * sum(timings) - 5.0)
+    return machine, fused, record
+
+
+print('check a fused machine sets all signals exactly as before')
+m_plain, _, record_plain = run_bbc(False)
+m_fused, fused, record_fused = run_bbc(True)
+okeq(len(record_plain) > 500, True)
+okeq(record_fused, record_plain)
+okeq(sorted(set(type(dev).__name__ for dev in fused)),
+     ['SigBitslice', 'SigJoin', 'SigSendCopy'])
+okeq(m_fused.ir_lower7._fused, True)
+okeq(m_plain.ir_lower7._fused, False)
+
+print('check joins evaluated inline need no update events')
+m_inline, _, record_inline = run_bbc(True, inline_joins=True)
+counts_plain, counts_inline = m_plain.event_counts, m_inline.event_counts
+okeq(counts_plain['updates'] > 20, True)  # ... about 4 per instruction.
+okeq(counts_inline['updates'], 0)
+okeq(counts_inline['queued'], counts_plain['queued'])
+# For this machine, the signal events are the same at each time, only in a
+# different order within each timestep.
+okeq(Multiset(record_inline), Multiset(record_plain))
+okeq(m_inline.ir.output.state, m_plain.ir.output.state)
+okeq(m_inline.count_pm_addr.output.state, m_plain.count_pm_addr.output.state)
+
+print('check adjacent bitslices are merged')
+conns = m_fused.ir.output.conns
+okeq(len(conns), 2)  # ... plus the recorder.
+# ... in the original connection order.
+okeq([dev.name for dev in fused_devices(conns[0])],
+     [conn.__self__.name for conn in m_plain.ir.output.conns[:-1]])
+okeq(len(fused_devices(conns[0])), len(CONTROL_BITS))
+
+print('check fused inputs cannot be hooked, but unfused ones are skipped')
+with fails(ValueError):
+    m_fused.ir_lower7.trace('input')
+with Simulation('fuse_counter') as sim:
+    counter = Counter('fuse_count', n_bits=3)
+    din = Signal('fuse_din')
+    counter.connect('input', din)
+    slice_0 = SigBitslice('fuse_bit0', 0)
+    slice_0.connect('input', counter.output)
+    slice_0.trace('input')
+fused = fuse([din, counter])
+okeq(slice_0 in fused, False)
+okeq(counter._output_combined in fused, True)
+okeq(fuse(sim), [])  # Nothing more to do.
+sim.seq.addall([setsig(50.0 * i_count, din, 1) for i_count in range(5)])
+sim.run()
+okeq(counter.output.state, 5)
+okeq(slice_0.output.state, 1)
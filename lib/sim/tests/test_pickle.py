@@ -0,0 +1,86 @@
+import gc
+import pickle
+
+from sim.signal import Signal, SetState, setsig, _SIGNALS
+from sim.sequencer import Event, HeapSequencer
+from sim.device import Action, _DEVICES
+from sim.device.latch import PulseLatch
+from sim.device.pseudo_devices import sig_join
+from sim.simulation import Simulation
+
+from sim.tests import okeq, okin, fails
+
+seq = HeapSequencer()
+latch = PulseLatch('pkl_latch', sequencer=seq)
+din = Signal('pkl_din')
+latch.connect('input', din)
+
+print('check actions pickle compactly, and rebind to the same device')
+action = Action(latch, '_output_update', 7)
+data = pickle.dumps(action, protocol=2)
+okeq(len(data) < 200, True)
+action2 = pickle.loads(data)
+okeq(action2.device is latch, True)
+okeq(action2.args, (7,))
+okeq(str(action2), str(action))
+
+print('check events + stimulus pickle, and still run')
+events = [Event(setsig(10., din, 3)),
+          Event(((12., 1), action))]
+events2 = pickle.loads(pickle.dumps(events, protocol=2))
+okeq(events2[0].call.signal is din, True)
+okeq(events2[1].priority, 1)
+outputs = []
+latch.output.add_connection(lambda t, sig: outputs.append((t, sig.state)))
+seq.addall(events2)
+seq.run(12.)
+okeq(latch.output.state, 7)
+okeq(outputs[-1], (12., 7))
+seq.run()
+okeq(outputs[-1], (15., 3))  # latch output delay=5
+
+print('check device methods pickle')
+method = pickle.loads(pickle.dumps(latch._output_update, protocol=2))
+okeq(method, latch._output_update)
+join = sig_join('pkl_join', [(din, 4), (latch.output, 4)])
+method = pickle.loads(pickle.dumps(join.in_2, protocol=2))
+okeq(method, join.in_2)
+
+print('check an unknown device cannot be rebound')
+data = pickle.dumps(Action(PulseLatch('pkl_latch_temporary'), 'reset'))
+with fails(ValueError):
+    pickle.loads(data)
+
+print('check references rebind to the right simulation, or are ambiguous')
+with Simulation('pkl_sim_1'):
+    latch_1 = PulseLatch('pkl_sim_latch')
+with Simulation('pkl_sim_2'):
+    latch_2 = PulseLatch('pkl_sim_latch')
+for sim_latch in (latch_1, latch_2):
+    data = pickle.dumps(Action(sim_latch, 'reset'))
+    okeq(pickle.loads(data).device is sim_latch, True)
+signal_1 = Signal('pkl_twice')
+signal_2 = Signal('pkl_twice')
+data = pickle.dumps(signal_2)
+with fails(ValueError):
+    pickle.loads(data)
+del signal_1
+okeq(pickle.loads(data) is signal_2, True)
+
+print('check discarded simulations are dropped from the registries')
+
+
+def registered(simulation_name):
+    return [key for registry in (_SIGNALS, _DEVICES)
+            for key in registry._refs if key[0] == simulation_name]
+
+
+with Simulation('pkl_discarded'):
+    discarded_latch = PulseLatch('pkl_discarded_latch')
+    discarded_latch.connect('input', Signal('pkl_discarded_input'))
+okeq(len(registered('pkl_discarded')), 3)
+del discarded_latch
+# N.B. the device and its signals are in reference cycles.
+gc.collect()
+okeq(registered('pkl_discarded'), [])
+print('')
@@ -172,3 +172,42 @@ okeq(events,
          (400., 0b10111),
          (400., 0b10101),
      ])
+
+print('')
+print('check lazy joins')
+from sim.sequencer import Sequencer
+from sim.device.pseudo_devices import sig_join
+seq = Sequencer()
+lazy_a, lazy_b = Signal('lazy_a'), Signal('lazy_b')
+d_lazy = sig_join('lazy_join', [(lazy_a, 2), (lazy_b, 3)],
+                  sequencer=seq, lazy=True)
+seq.addall([setsig(10.0, lazy_a, 0b11), setsig(10.0, lazy_b, 0b1101)])
+seq.run()
+# Nothing subscribed : no events were needed.
+okeq(seq.events, [])
+okeq(d_lazy._state, 'idle')
+okeq(d_lazy.output.state, 0b11101)
+seq.add(setsig(20.0, lazy_b, SIG_UNDEF))
+seq.run()
+okeq(d_lazy.output.state, SIG_UNDEF)
+# With a subscriber, changes generate events, just as for a normal join.
+lazy_events = []
+d_lazy.output.add_connection(
+    lambda time, signal: lazy_events.append((time, signal.state)))
+seq.addall([setsig(30.0, lazy_b, 1), setsig(30.0, lazy_a, 2)])
+seq.run()
+okeq(lazy_events, [(30.0, 0b10001)])
+okeq(d_lazy.output.previous, SIG_UNDEF)
+# Subscribing after an unobserved change : the first event still records the
+# state from before it as 'previous', even though it was never read.
+d_lazy_2 = sig_join('lazy_join_2', [(lazy_a, 2), (lazy_b, 3)],
+                    sequencer=seq, lazy=True)
+seq.add(setsig(40.0, lazy_b, 3))
+seq.run()
+lazy_events_2 = []
+d_lazy_2.output.add_connection(
+    lambda time, signal: lazy_events_2.append(
+        (time, signal.previous, signal.state)))
+seq.add(setsig(50.0, lazy_a, 1))
+seq.run()
+okeq(lazy_events_2, [(50.0, 0b10011, 0b01011)])
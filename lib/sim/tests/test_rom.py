@@ -53,3 +53,12 @@ SEQ.run(150.)
 okeq(rom.out.state, 42)
 SEQ.run()
 okeq(rom.out.state, 4)
+
+print('\ncheck a read with an undefined address fails')
+SEQ.addall([
+    setsig(300.0, addr, 'undefined'),
+    setsig(310.0, aen, '!'),
+    setsig(315.0, read, '!'),
+])
+with fails(ValueError):
+    SEQ.run()
@@ -0,0 +1,26 @@
+from sim.bbc.sweep import run_candidate
+from sim.bbc.search import min_cycle_search
+
+from sim.tests import okeq, okin, fails
+
+start = [30.0, 2.5, 12.0, 20.0, 10.0, 10.0]
+
+print('check search finds tight durations')
+result = min_cycle_search(start, tolerance=0.25, n_cycles=16)
+print(result)
+okeq(result.cycle_time < sum(start), True)
+okeq(run_candidate(result.timings, n_cycles=16).passed, True)
+# A little less on the 'next' phase does not work.
+tighter = result.timings[:]
+tighter[0] -= 0.25
+okeq(run_candidate(tighter, n_cycles=16).passed, False)
+
+print('check multi-point search, in parallel, gets a similar result')
+result_2 = min_cycle_search(start, tolerance=0.25, n_cycles=16, processes=2)
+okeq(abs(result_2.timings[0] - result.timings[0]) <= 0.25, True)
+okeq(run_candidate(result_2.timings, n_cycles=16).passed, True)
+
+print('check a failing start is rejected')
+with fails(ValueError):
+    min_cycle_search([4.0, 2.5, 12.0, 20.0, 10.0, 10.0], n_cycles=16)
+print('')
@@ -148,3 +148,236 @@ okeq(results, [
 ])
 
 print('')
+
+print('check all sequencer types give the same ordering')
+from sim.sequencer import ListSequencer, HeapSequencer, CalendarSequencer
+
+
+def run_ordering(seq):
+    order = []
+
+    def cb(label):
+        def _inner(time):
+            order.append((time, label))
+            if label == 'spawn':
+                seq.add((time, cb('spawned')))
+                seq.add(((time, 1), cb('spawned-1')))
+        return _inner
+
+    for i_ev, key in enumerate([
+            3., (1., 2), 3., (3., -1), 1., (3., 5),
+            2., 3., (1., 2), (2., -9999)]):
+        seq.add((key, cb(i_ev)))
+    seq.add((2., cb('spawn')))
+    seq.run()
+    return order
+
+
+okeq(run_ordering(HeapSequencer()),
+     run_ordering(ListSequencer()))
+okeq(run_ordering(CalendarSequencer()),
+     run_ordering(ListSequencer()))
+okeq(run_ordering(CalendarSequencer(bucket_width=0.3)),
+     run_ordering(ListSequencer()))
+print('')
+
+print('check calendar sequencer ordering, with many spread-out events')
+import random
+
+
+def run_random(seq, n_events=2000):
+    rand = random.Random(1)
+    order = []
+
+    def cb(i_ev):
+        def _inner(time):
+            order.append((time, i_ev))
+            if i_ev % 3 == 0 and time < 500.:
+                # Reschedule a short way ahead (some at the same time).
+                seq.add(((time + rand.choice([0., 0.5, 1., 7.5]),
+                          rand.choice([0, 1])),
+                         cb(i_ev + 1)))
+        return _inner
+
+    for i_ev in range(n_events):
+        time = rand.choice([rand.uniform(0., 1000.),
+                            float(rand.randint(0, 20)),
+                            rand.uniform(1.0e4, 1.0e5)])
+        seq.add(((time, rand.randint(-1, 1)), cb(i_ev)))
+    seq.run(300.)
+    order.append('stopped')
+    seq.run()
+    return order
+
+
+expected = run_random(HeapSequencer())
+okeq(run_random(CalendarSequencer()), expected)
+okeq(run_random(CalendarSequencer(bucket_width=2.5)), expected)
+print('')
+
+print('check same-time + priority events always run in the order added')
+from sim.sequencer import Event
+
+for seq_type in (ListSequencer, HeapSequencer, CalendarSequencer):
+    seq = seq_type()
+    order = []
+    events = [Event(((10., 1), lambda t, i=i: order.append(i)))
+              for i in range(50)]
+    for event in events[::2] + events[1::2]:
+        seq.add(event)
+    okeq([event.key()[:2] for event in events], [(10., -1)] * 50)
+    okeq(events[2].key()[2] - events[0].key()[2], 1)
+    seq.run()
+    okeq(order, list(range(0, 50, 2)) + list(range(1, 50, 2)))
+print('')
+
+print('check adding all at once matches adding one at a time')
+import gc
+from sim.sequencer import BULK_ADD_SIZE
+
+
+def run_bulk(seq, bulk):
+    rand = random.Random(2)
+    order = []
+
+    def cb(label):
+        def _inner(time):
+            order.append((time, label))
+            if label % 7 == 0:
+                return [(time + 1.0, cb(label + 1)),
+                        ((time, 3), cb(label + 2))]
+        return _inner
+
+    for i_batch in range(4):
+        events = [((float(rand.randint(0, 300)), rand.randint(-1, 1)),
+                   cb(100 * i_batch + i_ev))
+                  for i_ev in range(rand.choice([3, 100]))]
+        if bulk:
+            seq.addall(events)
+        else:
+            for event in events:
+                seq.add(event)
+        seq.run(75.0 * i_batch)
+    seq.run()
+    return order
+
+
+expected = run_bulk(ListSequencer(), bulk=False)
+for seq_type in (ListSequencer, HeapSequencer, CalendarSequencer):
+    okeq(run_bulk(seq_type(), bulk=True), expected)
+# A bulk add numbers its events in order, after any already added, and
+# leaves the garbage collector as it was.
+for seq_type in (HeapSequencer, CalendarSequencer):
+    seq = seq_type()
+    first = seq.add((1.0, lambda t: None))
+    events = seq.addall([(float(i_ev), lambda t: None)
+                         for i_ev in range(BULK_ADD_SIZE)])
+    last = seq.add((1.0, lambda t: None))
+    okeq([event.seq for event in events],
+         list(range(2, BULK_ADD_SIZE + 2)))
+    okeq(last.seq, BULK_ADD_SIZE + 2)
+    okeq(gc.isenabled(), True)
+    gc.disable()
+    seq.addall([(0.0, lambda t: None)] * BULK_ADD_SIZE)
+    okeq(gc.isenabled(), False)
+    gc.enable()
+print('')
+
+print('check cancelled events are skipped, and tombstones get cleared out')
+for seq_type in (ListSequencer, HeapSequencer, CalendarSequencer):
+    seq = seq_type()
+    order = []
+    events = [seq.add((float(i), lambda t: order.append(t)))
+              for i in range(10)]
+    okeq(seq.cancel(events[3]), True)
+    okeq(seq.cancel(events[3]), False)
+    seq.run(4.5)
+    okeq(order, [0., 1., 2., 4.])
+    okeq(seq.cancel(events[4]), False)  # Already happened.
+    for event in events[5:8]:
+        seq.cancel(event)
+    # Cancelling more than half the queue compacts it.
+    okeq(seq._n_cancelled, 0)
+    okeq(seq.events, events[8:])
+    seq.run()
+    okeq(order, [0., 1., 2., 4., 8., 9.])
+
+    # Events returned from 'addall' can also be cancelled.
+    order = []
+    events = seq.addall([(t, lambda t: order.append(t))
+                         for t in (20., 10., 30.)])
+    seq.cancel(events[0])
+    seq.run()
+    okeq(order, [10., 30.])
+
+    # Events discarded by 'clear' are no longer pending.
+    event = seq.add((40., lambda t: None))
+    seq.clear()
+    okeq(event.pending, False)
+    okeq(seq.cancel(event), False)
+    okeq(seq._n_cancelled, 0)
+print('')
+
+print('check the sequencer time is that of the latest event run')
+for seq_type in (ListSequencer, HeapSequencer, CalendarSequencer):
+    seq = seq_type()
+    okeq(seq.time, None)
+    seq.addall([(3., cb_add_2), (5., cb_add_2)])
+    seq.run(4.)
+    okeq(seq.time, 3.)
+print('')
+
+print('check plain calls with arguments, and their priority')
+for seq_type in (ListSequencer, HeapSequencer, CalendarSequencer):
+    seq = seq_type()
+    order = []
+    seq.add_call(2., lambda t, x: order.append((t, x)), ('late',),
+                 priority=-1)
+    seq.add_call(2., lambda t, x, y: order.append((t, x, y)), ('a', 'b'))
+    event = seq.add_call(1., lambda t: order.append(t))
+    okeq(event.args, ())
+    seq.run()
+    okeq(order, [1., (2., 'a', 'b'), (2., 'late')])
+print('')
+
+print('check update regions (delta cycles)')
+for seq_type in (ListSequencer, HeapSequencer, CalendarSequencer):
+    seq = seq_type()
+    order = []
+
+    def update(t, name):
+        order.append(('update', t, name))
+        if name == 'u1':
+            # A new event at the same time is a further delta cycle ...
+            seq.add_call(t, event, ('e3',))
+
+    def event(t, name):
+        order.append(('event', t, name))
+        if name == 'e1':
+            # Updates run after all the same-time events, in order added.
+            seq.add_update(t, update, ('u1',))
+            seq.add_update(t, update, ('u2',))
+        elif name == 'e3':
+            # ... and its updates follow it.
+            seq.add_update(t, update, ('u3',))
+
+    seq.add_call(1., event, ('e1',))
+    seq.add_call(1., event, ('e2',), priority=-10)
+    seq.add_call(2., event, ('e4',))
+    # An update for a future time is queued after all events at that time.
+    okeq(seq.add_update(2., update, ('u4',)).time, 2.)
+    seq.add_call(2., event, ('e5',), priority=-10)
+    seq.run()
+    okeq(order, [('event', 1., 'e1'), ('event', 1., 'e2'),
+                 ('update', 1., 'u1'), ('update', 1., 'u2'),
+                 ('event', 1., 'e3'), ('update', 1., 'u3'),
+                 ('event', 2., 'e4'), ('event', 2., 'e5'),
+                 ('update', 2., 'u4')])
+
+    # Updates for the current time also run when stopping at that time.
+    order = []
+    seq.add_call(5., event, ('e1',))
+    seq.run(5.)
+    okeq([entry[2] for entry in order], ['e1', 'u1', 'u2', 'e3', 'u3'])
+    okeq(seq._updates, [])
+print('')
@@ -17,3 +17,97 @@ msg = 'x untraced, ={}'
 print(msg.format(x.state))
 x.set(0., 0)
 print(msg.format(x.state))
+
+from sim.signal import SIG_UNDEF
+from sim.device import Device
+from sim.tests import okeq, fails
+
+
+print('\ncheck filtered connections')
+bus = Signal('bus')
+seen = []
+
+
+def record(tag):
+    return lambda time, sig: seen.append((tag, time, sig.previous, sig.state))
+
+
+def connect_last(call, **kwargs):
+    # N.B. by default, 'add_connection' inserts *before* the last one.
+    bus.add_connection(call, index=len(bus.conns), **kwargs)
+
+
+connect_last(record('all'))
+connect_last(record('bit1'), mask=1, shift=1)
+connect_last(record('bit1-change'), mask=1, shift=1, edge='change')
+connect_last(record('nonzero'), edge='nonzero')
+connect_last(record('last'))
+bus.set(1.0, 2)
+okeq(seen, [('all', 1.0, 0, 2), ('bit1', 1.0, 0, 1),
+            ('bit1-change', 1.0, 0, 1), ('nonzero', 1.0, 0, 2),
+            ('last', 1.0, 0, 2)])
+seen[:] = []
+bus.set(2.0, 3)
+okeq([tag for tag, _, _, _ in seen],
+     ['all', 'bit1', 'nonzero', 'last'])
+seen[:] = []
+bus.set(3.0, 0)
+okeq([tag for tag, _, _, _ in seen],
+     ['all', 'bit1', 'bit1-change', 'last'])
+seen[:] = []
+# Non-numeric states pass unmasked.
+bus.set(4.0, SIG_UNDEF)
+okeq(seen[1], ('bit1', 4.0, 0, SIG_UNDEF))
+okeq(len(seen), 5)
+with fails(ValueError):
+    bus.add_connection(record('bad'), edge='rising')
+# A shift with no mask selects all the higher bits.
+high = Signal('high_bits')
+high_seen = []
+high.add_connection(lambda time, sig: high_seen.append((time, sig.state)),
+                    shift=2)
+high.add_connection(lambda time, sig: high_seen.append(('change', sig.state)),
+                    shift=2, edge='change')
+high.set(1.0, 12)
+high.set(2.0, 13)  # no change in bits 2 and up
+high.set(3.0, 16.0)
+# N.B. the second connection goes before the first.
+okeq(high_seen, [('change', 3), (1.0, 3), (2.0, 3),
+                 ('change', 4), (3.0, 4)])
+
+
+class _Bits(Device):
+    def __init__(self, name, *args, **kwargs):
+        super(_Bits, self).__init__(name, *args, **kwargs)
+        self.got = []
+
+    @Device.input
+    def input(self, time, signal):
+        self.got.append((time, signal.state))
+
+
+print('check filtered device connections, and hooks on them')
+bits = _Bits('bits')
+bits.connect('input', bus, mask=3, shift=2, edge='change')
+bus.set(5.0, 0x4)
+bus.set(6.0, 0x5)  # no change in bits 2..3
+hooked = []
+
+
+def hook(device, time, signal):
+    hooked.append(time)
+
+
+bits.hook('input', hook)
+bus.set(7.0, 0xc)
+okeq(bits.got, [(5.0, 1), (7.0, 3)])
+okeq(hooked, [7.0])
+bits.unhook('input', hook)
+okeq('input' in bits.__dict__, False)
+bus.set(7.5, 0x8)
+okeq(bits.got[-1], (7.5, 2))
+okeq(hooked, [7.0])  # ... no longer hooked.
+bus.remove_connection(bits.input)
+bus.set(8.0, 0)
+okeq(bits.got[-1], (7.5, 2))
+okeq(bus._n_filtered, 3)
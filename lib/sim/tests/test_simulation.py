@@ -0,0 +1,92 @@
+import pickle
+import threading
+
+from sim.signal import Signal, setsig
+from sim.sequencer import DEFAULT_SEQUENCER as SEQ
+from sim.simulation import Simulation, current_simulation
+from sim.device import Action
+from sim.device.arith import Counter
+
+from sim.tests import okeq, okin, fails
+
+
+def build(name):
+    # Build a counter simulation, with the same device names every time.
+    with Simulation(name) as sim:
+        counter = Counter('sim_count', n_bits=3)
+        din = Signal('sim_din')
+        counter.connect('input', din)
+    return sim, counter, din
+
+
+okeq(current_simulation(), None)
+sim1, counter1, din1 = build('one')
+sim2, counter2, din2 = build('two')
+print(sim1)
+
+print('check devices belong to their own simulation')
+okeq(counter1.seq is sim1.seq, True)
+okeq(counter2.seq is sim2.seq, True)
+okeq(counter1.seq is SEQ, False)
+for bit_counter in counter1._bit_counters + counter1._carry_gates:
+    okeq(bit_counter.seq is sim1.seq, True)
+okeq(sim1.devices['sim_count'] is counter1, True)
+okin('sim_count__bit:2', sim1.devices)
+okeq(sim2.signals['sim_din'] is din2, True)
+
+print('check names are unique within a simulation')
+with sim1:
+    with fails(ValueError):
+        Signal('sim_din')
+    with fails(ValueError):
+        Counter('sim_count', n_bits=2)
+    # Internal signals of separate counters do not clash.
+    Counter('sim_count_2', n_bits=2)
+okeq(sim1.signals['sim_din'] is din1, True)
+okeq(sim1.devices['sim_count'] is counter1, True)
+
+print('check simulations run independently')
+sim1.seq.addall([setsig(10. * i, din1, 1) for i in range(1, 6)])
+sim2.seq.addall([setsig(10. * i, din2, 1) for i in range(1, 3)])
+sim1.run(29.)
+okeq(counter1.output.state, 2)
+okeq(counter2.output.state, 0)
+sim2.run()
+sim1.run()
+okeq(counter1.output.state, 5)
+okeq(counter2.output.state, 2)
+
+print('check pickled references rebind within the current simulation')
+data = pickle.dumps(Action(counter1, 'reset'))
+with sim1:
+    okeq(pickle.loads(data).device is counter1, True)
+with sim2:
+    okeq(pickle.loads(data).device is counter2, True)
+
+print('check simulations in separate threads')
+results = {}
+
+
+def run_one(n_counts):
+    sim, counter, din = build('thread{}'.format(n_counts))
+    sim.seq.addall([setsig(10. * i, din, 1) for i in range(n_counts)])
+    sim.run()
+    results[n_counts] = counter.output.state
+
+
+threads = [threading.Thread(target=run_one, args=(n_counts,))
+           for n_counts in range(1, 8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+okeq(results, dict((n_counts, n_counts) for n_counts in range(1, 8)))
+
+print('check whole-simulation checkpoint')
+checkpoint = sim1.checkpoint()
+sim1.seq.add(setsig(100., din1, 1))
+sim1.run()
+okeq(counter1.output.state, 6)
+checkpoint.restore()
+okeq(counter1.output.state, 5)
+print('')
@@ -0,0 +1,47 @@
+from sim.bbc.sweep import \
+    grid, random_sample, sweep, run_candidate, format_results, \
+    DEFAULT_DURATIONS
+
+from sim.tests import okeq, okin, fails
+
+print('check candidate generation')
+candidates = grid([[20.0, 30.0], 2.5, [8.0, 12.0], 20.0, 10.0, 10.0])
+okeq(len(candidates), 4)
+okeq(candidates[1], [20.0, 2.5, 12.0, 20.0, 10.0, 10.0])
+samples = random_sample([(20.0, 30.0), 2.5, 12.0, 20.0, 10.0, 10.0],
+                        3, seed=1)
+okeq(len(samples), 3)
+okeq(all(20.0 <= sample[0] <= 30.0 and sample[1] == 2.5
+         for sample in samples), True)
+
+print('check a single run')
+result = run_candidate(DEFAULT_DURATIONS, n_cycles=4)
+okeq(result.passed, False)  # 'next' phase is too short for carries
+okeq(result.t_violation, 4.0)
+okin('set-addr', result.violation)
+result = run_candidate([30.0, 2.5, 12.0, 20.0, 10.0, 10.0], n_cycles=70)
+okeq(result.passed, True)
+okeq(result.cycle_time, 84.5)
+
+print('check invalid candidates are rejected')
+for timings in ([0.0] * 6, [-1.0, 2.0, 2.0, 2.0, 2.0, 2.0],
+                [30.0, 2.5, 12.0], DEFAULT_DURATIONS + [10.0]):
+    with fails(ValueError):
+        run_candidate(timings)
+with fails(ValueError):
+    sweep(candidates + [[0.0] * 6], processes=0)
+
+print('check other errors in a run are recorded as failures')
+# An IR value which cannot be split into bits.
+result = run_candidate([30.0, 2.5, 12.0, 20.0, 10.0, 10.0],
+                       program=[('BAD', 1.5)], n_cycles=4)
+okeq(result.passed, False)
+okin('TypeError', result.violation)
+
+print('check parallel and serial sweeps agree')
+serial = sweep(candidates, n_cycles=32, processes=0)
+parallel = sweep(candidates, n_cycles=32, processes=2)
+okeq(parallel, serial)
+okeq([result.passed for result in serial], [False, False, True, True])
+print(format_results(serial))
+print('')
@@ -0,0 +1,91 @@
+from sim.signal import Signal, setsig
+from sim.sequencer import Sequencer
+from sim.checks import StateSet
+from sim.device.table import TableDevice, table_device, on_input, on_action
+
+from sim.tests import okeq, okin, fails
+
+
+@table_device
+class PulseStretch(TableDevice):
+    # Stretch an input pulse, then need a rest before the next one.
+    states = StateSet('ready', 'on', 'resting')
+    transitions = (
+        on_input('input', 'ready', 'on', '_t_on', '_off',
+                 effect='_output_on'),
+        on_action('_off', 'on', 'resting', '_t_rest', '_rested',
+                  effect='_output_off'),
+        on_action('_rested', 'resting', 'ready'),
+    )
+    timing_rules = (('_t_on', '_t_rest'),)
+
+    def __init__(self, name, t_on=5.0, t_rest=2.0, *args, **kwargs):
+        super(PulseStretch, self).__init__(name, *args, **kwargs)
+        self._t_on = t_on
+        self._t_rest = t_rest
+        self.add_output('output', 0)
+        self.reset()
+
+    def _output_on(self, time, signal):
+        self.output.set(time, 1)
+
+    def _output_off(self, time):
+        self.output.set(time, 0)
+
+
+seq = Sequencer()
+stretch = PulseStretch('stretch', sequencer=seq)
+din = Signal('stretch_in')
+stretch.connect('input', din)
+print(PulseStretch.input.__doc__)
+
+print('check the table transitions')
+okeq(stretch.state_name, 'ready')
+seq.add(setsig(10.0, din, 1))
+seq.run(12.0)
+okeq(stretch.state_name, 'on')
+okeq(stretch.output.state, 1)
+seq.run(15.0)
+okeq(stretch.state_name, 'resting')
+okeq(stretch.output.state, 0)
+seq.run()
+okeq(stretch.state_name, 'ready')
+
+print('check table inputs can be traced and hooked')
+seen = []
+stretch.hook('input', lambda dev, time, signal: seen.append(time))
+stretch.trace('_off')
+seq.add(setsig(30.0, din, 1))
+seq.run()
+okeq(seen, [30.0])
+okeq(stretch.state_name, 'ready')
+
+print('check state violations')
+seq.addall([setsig(40.0, din, 1), setsig(42.0, din, 1)])
+with fails(ValueError):
+    seq.run()
+seq.clear()
+
+print('check the timing rules')
+with fails(ValueError):
+    PulseStretch('stretch_bad', t_on=1.0, t_rest=2.0, sequencer=seq)
+with fails(ValueError):
+    PulseStretch('stretch_bad', t_on=-3.0, t_rest=-5.0, sequencer=seq)
+
+print('check bad tables')
+with fails(ValueError):
+    @table_device
+    class BadState(TableDevice):
+        states = StateSet('ready', 'on')
+        transitions = (on_input('input', 'ready', 'of'),)
+with fails(ValueError):
+    @table_device
+    class BadThen(TableDevice):
+        states = StateSet('ready', 'on')
+        transitions = (on_input('input', 'ready', 'on', '_t', '_off'),)
+with fails(ValueError):
+    @table_device
+    class BadReach(TableDevice):
+        states = StateSet('ready', 'on', 'never')
+        transitions = (on_input('input', 'ready', 'on'),
+                       on_input('other', 'never', 'ready'))
@@ -0,0 +1,122 @@
+import random
+
+import numpy as np
+
+from sim.signal import Signal, SIG_UNDEF
+from sim.sequencer import Sequencer
+
+from sim.tests import okeq, okin, setsig, fails
+
+from sim.device.arith import (
+    Counter, VALUE_TOGGLING, CARRY_PROPAGATING, CONTROLS_CHANGING)
+from sim.device.tolerance import (
+    perturbed_timings, evaluate_ensemble, summarise, format_summary,
+    PERTURBED_TIMINGS)
+
+
+def run_counter(stimuli, n_bits, timings, i_sample):
+    # Run a structural counter, with the one-bit timings of one sample.
+    # Returns the final value (or None, if it fails), and the bit output
+    # change times.
+    seq = Sequencer()
+    counter = Counter('tst_count', n_bits=n_bits, sequencer=seq)
+    for i_bit, bit_counter in enumerate(counter._bit_counters):
+        bit_counter._t_0_1 = timings['t_toggle_0_to_1'][i_sample, i_bit]
+        bit_counter._t_1_0 = timings['t_toggle_1_to_0'][i_sample, i_bit]
+        bit_counter._t_carry = timings['t_out_2_carry'][i_sample, i_bit]
+    signals = {}
+    for input_name in ('input', 'clear'):
+        signals[input_name] = Signal('tst_count_' + input_name)
+        counter.connect(input_name, signals[input_name])
+    changes = []
+    for bit_counter in counter._bit_counters:
+        bit_counter.output.add_connection(
+            lambda time, sig: (changes.append(time)
+                               if sig.state != SIG_UNDEF else None))
+    seq.addall([setsig(time, signals[name], value)
+                for time, name, value in stimuli])
+    try:
+        seq.run()
+    except ValueError:
+        return None, changes
+    return counter.output.state, changes
+
+
+print('check the perturbed timings')
+timings = perturbed_timings(100, 3, spread=0.1,
+                            onebit_kwargs={'t_out_2_carry': 2.}, seed=1)
+for name in PERTURBED_TIMINGS:
+    okeq(timings[name].shape, (100, 3))
+    okeq(bool(np.all(timings[name] >= 0.0)), True)
+okeq(abs(np.mean(timings['t_out_2_carry']) - 2.) < 0.05, True)
+okeq(timings['t_clear_onoff'], 4.)
+okeq(perturbed_timings(2, 3, spread=0.)['t_toggle_0_to_1'].tolist(),
+     [[3.] * 3] * 2)
+with fails(ValueError):
+    evaluate_ensemble([(10., 'input', 1)], 4, timings)
+print('')
+
+
+print('check the ensemble against structural counters')
+n_failed = 0
+for seed in range(12):
+    rand = random.Random(seed)
+    n_bits = rand.choice([3, 5])
+    stimuli = []
+    time = 0.
+    clearing = 0
+    for _ in range(12):
+        time += rand.choice([8., 12., 25., 40.])
+        if rand.random() < 0.2:
+            clearing = 1 - clearing
+            stimuli.append((time, 'clear', clearing))
+        else:
+            stimuli.append((time, 'input', rand.randrange(1, 1 << n_bits)))
+    timings = perturbed_timings(10, n_bits, spread=0.3, seed=seed)
+    result = evaluate_ensemble(stimuli, n_bits, timings)
+    for i_sample in range(10):
+        value, changes = run_counter(stimuli, n_bits, timings, i_sample)
+        okeq(result.violations[i_sample] == 0, value is not None)
+        if value is None:
+            n_failed += 1
+            continue
+        okeq(result.values[i_sample], value)
+        # The last change is the latest settle time of any input.
+        settles = [time + settle
+                   for (time, _, _), settle
+                   in zip(stimuli, result.settle_times[i_sample])
+                   if not np.isnan(settle)]
+        okeq(max(settles) if settles else None,
+             max(changes) if changes else None)
+okeq(0 < n_failed < 100, True)
+print('')
+
+
+print('check settle times, and violations')
+stimuli = [(0., 'input', 15), (30., 'input', 1), (60., 'input', 2)]
+result = evaluate_ensemble(stimuli, 4, perturbed_timings(5, 4, spread=0.))
+okeq(result.values.tolist(), [2] * 5)
+okeq(result.settle_times[0].tolist(), [3., 15., 3.])
+okeq(bool(np.all(np.isnan(result.violation_times))), True)
+summary = summarise(result)
+okeq(summary.failed, 0.)
+okeq(summary.settle_percentiles[100], 15.)
+
+# The clear comes near the end of a carry ripple :  Samples with a slow
+# ripple fail on the clear, and others on the next input, which arrives
+# while the controls are still changing.
+stimuli = [(0., 'input', 15), (30., 'input', 1),
+           (45., 'clear', 1), (46., 'input', 1)]
+result = evaluate_ensemble(stimuli, 4,
+                           perturbed_timings(1000, 4, spread=0.1, seed=3))
+for violation, time in zip(result.violations, result.violation_times):
+    if violation == CONTROLS_CHANGING:
+        okeq(time, 46.)
+    else:
+        okin(violation, (VALUE_TOGGLING, CARRY_PROPAGATING))
+        okeq(time, 45.)
+summary = summarise(result)
+okeq(summary.failed, 1.)
+okeq(0. < summary.controls_changing < 0.5, True)
+okeq(summary.settle_percentiles[50], None)
+print(format_summary(summary))
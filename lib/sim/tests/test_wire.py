@@ -5,6 +5,7 @@ if path not in sys.path:
     sys.path.append(path)
 
 import sim.tests
+from sim.tests import setsig
 from sim.signal import Signal, SIG_UNDEF
 from sim.sequencer import DEFAULT_SEQUENCER as SEQ
 from sim.device import Device, Action, ClockTick
@@ -107,3 +108,20 @@ print('check sig=1, wire=1, xor=0')
 okeq(sig1.state, 1)
 okeq(w01.output.state, 1)
 okeq(x01.out.state, 0)
+
+print('\ncheck inertial wire swallows pulses shorter than the delay')
+sig2 = Signal('s02')
+w02 = Wire('w02', delay=10., inertial=True)
+w02.connect('input', sig2)
+w02_changes = []
+w02.output.add_connection(
+    lambda t, sig: w02_changes.append((t, sig.state)))
+SEQ.addall([
+    setsig(400., sig2, 1),
+    setsig(405., sig2, 0),  # swallowed
+    setsig(420., sig2, 1),
+    setsig(425., sig2, 2),  # replaces the change to 1
+    setsig(450., sig2, 0),
+])
+SEQ.run()
+okeq(w02_changes, [(435., 2), (460., 0)])